@@ -4,8 +4,11 @@ class LinearNeuron(Neuron):
     def __init__(self, input_count: int) -> None:
         super().__init__(input_count)
 
-    def activation_function(self, x: float) -> float:
-        return x
+    def activation_function(self, x: float, out=None) -> float:
+        if out is None or out is x:
+            return x
+        out[...] = x
+        return out
 
     def derivative(self, x: float) -> float:
         return 1.0
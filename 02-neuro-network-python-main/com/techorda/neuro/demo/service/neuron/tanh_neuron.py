@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from neuron.neuron import Neuron
 
 
@@ -6,8 +7,11 @@ class TanhNeuron(Neuron):
     def __init__(self, input_count: int) -> None:
         super().__init__(input_count)
 
-    def activation_function(self, x: float) -> float:
-        return math.tanh(x)
+    def activation_function(self, x: float, out=None) -> float:
+        # Plain floats from Neuron.activate skip the ufunc dispatch
+        if type(x) is float:
+            return math.tanh(x)
+        return np.tanh(x, out=out)
 
     def derivative(self, x: float) -> float:
         """
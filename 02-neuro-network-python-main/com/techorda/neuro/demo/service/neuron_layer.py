@@ -1,19 +1,92 @@
 # python
-from typing import Sequence, List
-from neuron.neuron import Neuron
+from typing import Sequence, List, Optional
+import numpy as np
+from neuron.neuron import DTYPE, Neuron
 
 class NeuronLayer:
     def __init__(self, neurons: Sequence[Neuron]) -> None:
         if not neurons:
             raise ValueError("neurons must be a non-empty sequence")
         self.neurons: List[Neuron] = list(neurons)
+        # Training and predict run on W/b with the activation bound once;
+        # the neuron objects are only touched by pack() and unpack()
+        if len({type(neuron) for neuron in self.neurons}) == 1:
+            self._activation = self.neurons[0].activation_function
+            self._derivative = self.neurons[0].derivative
+        else:
+            self._activation = self._mixed_activation
+            self._derivative = self._mixed_derivative
+        self.pack()
+
+    def _mixed_activation(self, z: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Activation for layers mixing neuron types: each neuron's own
+        function is applied to its output column.
+        """
+        if out is None:
+            out = np.empty_like(z)
+        for column, neuron in enumerate(self.neurons):
+            neuron.activation_function(z[..., column], out=out[..., column])
+        return out
+
+    def _mixed_derivative(self, outputs: np.ndarray) -> np.ndarray:
+        derivative = np.empty_like(outputs)
+        for column, neuron in enumerate(self.neurons):
+            derivative[..., column] = neuron.derivative(outputs[..., column])
+        return derivative
+
+    def pack(self) -> None:
+        """
+        Copy neuron weights and biases into the layer's weight matrix W
+        of shape (n_out, n_in) and bias vector b of shape (n_out,).
+        """
+        self.W: np.ndarray = np.array([neuron.weights for neuron in self.neurons], dtype=DTYPE)
+        self.b: np.ndarray = np.array([neuron.bias for neuron in self.neurons], dtype=DTYPE)
+
+    def unpack(self) -> None:
+        """
+        Write the layer's weight matrix and bias vector back into its neurons.
+        """
+        for neuron, weights, bias in zip(self.neurons, self.W, self.b):
+            neuron.weights = weights.copy()
+            neuron.bias = float(bias)
 
     def activate(self, inputs: Sequence[float]) -> List[float]:
         """
         Activate all neurons in the layer with the given inputs and
-        return their outputs as a list of floats.
+        return their outputs as a list of floats. All neurons are
+        evaluated at once through the layer's weight matrix.
+        """
+        inputs = np.asarray(inputs, dtype=DTYPE)
+        if inputs.shape != (self.W.shape[1],):
+            raise ValueError("Input length does not match weights length.")
+        return self.forward(inputs).tolist()
+
+    def forward(self, inputs: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Vectorized activation: computes f(inputs @ W.T + b) for a single
+        input vector or a batch of row vectors in one matmul. When out is
+        given the result is written into it without further allocation.
+        """
+        z = np.matmul(inputs, self.W.T, out=out)
+        z += self.b
+        return self._activation(z, out=z)
+
+    def derivative(self, outputs: np.ndarray) -> np.ndarray:
+        """
+        Derivative of the layer's activation evaluated at its outputs.
+        """
+        return self._derivative(outputs)
+
+    def scale_delta(self, delta: np.ndarray, outputs: np.ndarray) -> np.ndarray:
+        """
+        Multiply delta in place by the activation derivative at outputs and
+        return it. A constant derivative of 1.0 (linear activation) is skipped.
         """
-        return [neuron.activate(inputs) for neuron in self.neurons]
+        derivative = self.derivative(outputs)
+        if np.ndim(derivative) or derivative != 1.0:
+            delta *= derivative
+        return delta
 
     def size(self) -> int:
         return len(self.neurons)
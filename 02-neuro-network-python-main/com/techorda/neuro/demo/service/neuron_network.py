@@ -1,14 +1,20 @@
-from typing import List
-import random
-from neuron_layer import NeuronLayer
+from typing import List, Optional
+import numpy as np
+from neuron_layer import DTYPE, NeuronLayer
 from neuron.tanh_neuron import TanhNeuron
 from neuron.linear_neuron import LinearNeuron
+from training_kernels import NUMBA_AVAILABLE, get_num_threads, train_tanh_linear
 
 
 class NeuronNetwork:
 
-    def __init__(self):
+    def __init__(self, fast_tanh: bool = False, seed: Optional[int] = None):
         self.layers: List = []  # layers = new ArrayList<>();
+        # Use the rational tanh approximation in the compiled kernel
+        self.fast_tanh = fast_tanh
+        # Weight init, training data and the shuffling on both training paths
+        # draw from this generator, so a fixed seed makes runs reproducible
+        self._rng = np.random.default_rng(seed)
 
         """
         Implement this constructor
@@ -28,43 +34,48 @@ class NeuronNetwork:
         
         for layer in self.layers:
             self.initialize_weights(layer)
+            layer.pack()
+        # Per-layer outputs of a single-sample predict, reused across calls
+        self._predict_buffers = [np.empty(layer.size(), dtype=DTYPE) for layer in self.layers]
         
-        # Generate training data and train the network
-        training_inputs, training_outputs = self._generate_training_data(1000)
-        self._train_with_data(training_inputs, training_outputs, epochs=2000, learning_rate=0.15)
+        # Generate training data and train the network; the dataset is kept
+        # so a parameterless train() can continue on it
+        self._training_data = self._generate_training_data(1000)
+        self._train_with_data(*self._training_data, epochs=2000, learning_rate=0.15)
 
     # implement this method
     def initialize_weights(self, layer):
-        # Weights are already initialized in Neuron.__init__
-        # This method is a placeholder for any additional initialization
-        pass
+        """
+        Draw the layer's weights and biases from [-0.5, 0.5), the same range
+        Neuron.__init__ uses, with one RNG call each.
+        """
+        weights = self._rng.uniform(-0.5, 0.5, size=(layer.size(), len(layer.neurons[0].weights)))
+        biases = self._rng.uniform(-0.5, 0.5, size=layer.size())
+        for neuron, neuron_weights, bias in zip(layer.neurons, weights.astype(DTYPE), biases):
+            neuron.weights = neuron_weights
+            neuron.bias = float(bias)
 
     def predict(self, inputs: List[float]) -> List[float]:
-        output = inputs
-        for layer in self.layers:
-            output = layer.activate(output)
-        return output
+        output = np.ascontiguousarray(inputs, dtype=DTYPE)
+        # A batch of inputs gets freshly allocated outputs
+        buffers = self._predict_buffers if output.ndim == 1 else [None] * len(self.layers)
+        for layer, buffer in zip(self.layers, buffers):
+            output = layer.forward(output, out=buffer)
+        return output.tolist()
 
     def _generate_training_data(self, num_samples: int):
         """
         Generate training data for circle classification.
         A point (x, y) is inside the circle if x^2 + y^2 <= 25 (radius = 5)
-        Returns: (training_inputs, training_outputs)
+        Returns: (training_inputs, training_outputs) as arrays of shape
+        (num_samples, 2) and (num_samples, 1)
         """
-        training_inputs = []
-        training_outputs = []
+        # Generate random coordinates in range [-8, 8] with a single RNG call
+        training_inputs = self._rng.uniform(-8.0, 8.0, size=(num_samples, 2)).astype(DTYPE)
         
-        for _ in range(num_samples):
-            # Generate random coordinates in range [-8, 8]
-            x = random.uniform(-8, 8)
-            y = random.uniform(-8, 8)
-            
-            # Check if point is inside circle (radius 5)
-            distance_squared = x * x + y * y
-            is_inside = 1.0 if distance_squared <= 25.0 else 0.0
-            
-            training_inputs.append([x, y])
-            training_outputs.append([is_inside])
+        # Check if point is inside circle (radius 5)
+        distance_squared = np.einsum('ij,ij->i', training_inputs, training_inputs)
+        training_outputs = (distance_squared <= 25.0).astype(DTYPE).reshape(-1, 1)
         
         return training_inputs, training_outputs
 
@@ -80,91 +91,154 @@ class NeuronNetwork:
     Hint: You will need to implement forward propagation,
     error calculation, backpropagation, and weight updates.
     """
-    def train(self, training_inputs=None, training_outputs=None, epochs=None, learning_rate=None):
+    def train(self, training_inputs=None, training_outputs=None, epochs=None, learning_rate=None, batch_size=None):
         """
         Overloaded train method that can be called with or without parameters.
-        - train(): Generates new training data and trains the network
+        - train(): Trains further on the dataset generated at construction
         - train(training_inputs, training_outputs, epochs, learning_rate): Trains with provided data
+        batch_size switches from full-batch training to shuffled mini-batches.
         """
         if training_inputs is None:
-            # Parameterless call - generate new training data with larger dataset
-            training_inputs, training_outputs = self._generate_training_data(1000)
+            # Parameterless call - reuse the construction-time dataset
+            training_inputs, training_outputs = self._training_data
             epochs = 2000
             learning_rate = 0.15
         
-        self._train_with_data(training_inputs, training_outputs, epochs, learning_rate)
+        self._train_with_data(training_inputs, training_outputs, epochs, learning_rate, batch_size)
     
-    def _train_with_data(self, training_inputs, training_outputs, epochs, learning_rate):
+    def _train_with_data(self, training_inputs, training_outputs, epochs, learning_rate, batch_size=None):
         """
         Internal training method using backpropagation.
         Implements forward propagation, error calculation, backpropagation, and weight updates.
         Uses Mean Squared Error (MSE) as the loss function.
         Logs the total error every 1000 epochs.
         """
+        # C-contiguous float32 keeps matmul on the sgemm path and gives the
+        # compiled kernel the array layout it was specialized for
+        inputs_matrix = np.ascontiguousarray(training_inputs, dtype=DTYPE)
+        outputs_matrix = np.ascontiguousarray(training_outputs, dtype=DTYPE)
+        batch_size = min(batch_size or len(inputs_matrix), len(inputs_matrix))
+
+        if self._can_use_kernel():
+            self._train_with_kernel(inputs_matrix, outputs_matrix, epochs, learning_rate, batch_size)
+        else:
+            self._train_with_numpy(inputs_matrix, outputs_matrix, epochs, learning_rate, batch_size)
+        
+        # Keep the neuron objects in sync with the trained matrices
+        for layer in self.layers:
+            layer.unpack()
+
+    def _can_use_kernel(self) -> bool:
+        """
+        The compiled kernel covers the all-tanh -> all-linear architecture
+        and is only used when Numba is installed.
+        """
+        return (
+            NUMBA_AVAILABLE
+            and len(self.layers) == 2
+            and all(isinstance(neuron, TanhNeuron) for neuron in self.layers[0].neurons)
+            and all(isinstance(neuron, LinearNeuron) for neuron in self.layers[1].neurons)
+        )
+
+    def _train_with_kernel(self, inputs_matrix, outputs_matrix, epochs, learning_rate, batch_size):
+        """
+        Runs the whole epoch loop in the Numba-compiled kernel, which
+        updates the layer matrices in place.
+        """
+        hidden_layer, output_layer = self.layers
+        errors = train_tanh_linear(
+            inputs_matrix, outputs_matrix,
+            hidden_layer.W, hidden_layer.b, output_layer.W, output_layer.b,
+            epochs, learning_rate, batch_size, self.fast_tanh, get_num_threads(),
+            # Derived from the network's generator so a seeded network
+            # shuffles the same way on every run
+            int(self._rng.integers(0, 2**32 - 1)),
+        )
+        
+        # Log error every 500 epochs
+        for epoch in range(499, epochs, 500):
+            mse = errors[epoch] / len(inputs_matrix)
+            print(f"Epoch {epoch + 1}/{epochs}, MSE: {mse:.6f}")
+
+    def _train_with_numpy(self, inputs_matrix, outputs_matrix, epochs, learning_rate, batch_size):
+        """
+        Batched training with one matmul per layer per batch. With
+        batch_size < num_samples the data is reshuffled every epoch.
+        """
+        num_samples = len(inputs_matrix)
+        shuffle = batch_size < num_samples
+        
+        # Activation and delta buffers are allocated once and overwritten every batch
+        activations = [np.empty((batch_size, layer.size()), dtype=DTYPE) for layer in self.layers]
+        deltas = [np.empty((batch_size, layer.size()), dtype=DTYPE) for layer in self.layers]
+        if shuffle:
+            shuffled_inputs = np.empty_like(inputs_matrix)
+            shuffled_outputs = np.empty_like(outputs_matrix)
+        
+        # Batch boundaries and the learning rate scaled by each batch's size
+        # are the same every epoch, so compute them once
+        batches = [
+            (start, start + batch_size, learning_rate / (min(start + batch_size, num_samples) - start))
+            for start in range(0, num_samples, batch_size)
+        ]
+
         for epoch in range(epochs):
-            total_error = 0.0
+            epoch_inputs, epoch_outputs = inputs_matrix, outputs_matrix
+            if shuffle:
+                # One C-level gather through a permutation index instead of a Python shuffle
+                order = self._rng.permutation(num_samples)
+                epoch_inputs = np.take(inputs_matrix, order, axis=0, out=shuffled_inputs)
+                epoch_outputs = np.take(outputs_matrix, order, axis=0, out=shuffled_outputs)
             
-            # Forward pass and backward pass for each training sample
-            for inputs, expected_output in zip(training_inputs, training_outputs):
-                # Forward propagation - compute outputs and store activations
-                layer_outputs = [inputs]  # Store input as first layer output
-                current_input = inputs
-                
-                for layer in self.layers:
-                    current_output = layer.activate(current_input)
-                    layer_outputs.append(current_output)
-                    current_input = current_output
-                
-                # Get final prediction
-                final_output = layer_outputs[-1]
-                
-                # Calculate error for this sample
-                error = expected_output[0] - final_output[0]
-                total_error += error * error
-                
-                # Backpropagation
-                deltas = [[] for _ in self.layers]
-                
-                # Output layer delta
-                output_neuron = self.layers[-1].neurons[0]
-                output_activation = layer_outputs[-1][0]
-                delta_output = error * output_neuron.derivative(output_activation)
-                deltas[-1].append(delta_output)
-                
-                # Hidden layers deltas (backpropagation)
-                for layer_idx in range(len(self.layers) - 2, -1, -1):
-                    layer = self.layers[layer_idx]
-                    next_layer = self.layers[layer_idx + 1]
-                    
-                    layer_deltas = []
-                    for neuron_idx, neuron in enumerate(layer.neurons):
-                        # Calculate weighted sum of deltas from next layer
-                        weighted_delta_sum = 0.0
-                        for next_neuron_idx, next_neuron in enumerate(next_layer.neurons):
-                            weighted_delta_sum += deltas[layer_idx + 1][next_neuron_idx] * next_neuron.weights[neuron_idx]
-                        
-                        # Multiply by derivative of activation function
-                        neuron_output = layer_outputs[layer_idx + 1][neuron_idx]
-                        delta = weighted_delta_sum * neuron.derivative(neuron_output)
-                        layer_deltas.append(delta)
-                    
-                    deltas[layer_idx] = layer_deltas
-                
-                # Update weights and biases
-                for layer_idx, layer in enumerate(self.layers):
-                    layer_input = layer_outputs[layer_idx]
-                    
-                    for neuron_idx, neuron in enumerate(layer.neurons):
-                        delta = deltas[layer_idx][neuron_idx]
-                        
-                        # Update weights
-                        for weight_idx in range(len(neuron.weights)):
-                            neuron.weights[weight_idx] += learning_rate * delta * layer_input[weight_idx]
-                        
-                        # Update bias
-                        neuron.bias += learning_rate * delta
+            total_error = 0.0
+            for start, end, effective_lr in batches:
+                total_error += self._train_batch(
+                    epoch_inputs[start:end], epoch_outputs[start:end],
+                    activations, deltas, effective_lr,
+                )
             
             # Log error every 500 epochs
             if (epoch + 1) % 500 == 0:
-                mse = total_error / len(training_inputs)
+                mse = total_error / num_samples
                 print(f"Epoch {epoch + 1}/{epochs}, MSE: {mse:.6f}")
+
+    def _train_batch(self, batch_inputs, batch_outputs, activations, deltas, effective_lr) -> float:
+        """
+        One forward/backward pass and weight update over a batch, using the
+        preallocated activation and delta buffers. effective_lr is the
+        learning rate already divided by the batch size. Returns the batch's
+        total squared error.
+        """
+        batch_len = len(batch_inputs)
+        layer_outputs = [batch_inputs] + [buffer[:batch_len] for buffer in activations]
+        batch_deltas = [buffer[:batch_len] for buffer in deltas]
+        
+        # Forward propagation - the whole batch goes through
+        # one (batch_len, n_in) @ (n_in, n_out) matmul per layer
+        for layer_idx, layer in enumerate(self.layers):
+            layer.forward(layer_outputs[layer_idx], out=layer_outputs[layer_idx + 1])
+        
+        # Calculate error for all samples
+        error = np.subtract(batch_outputs, layer_outputs[-1], out=batch_deltas[-1])
+        total_error = float(np.einsum('ij,ij->', error, error))
+        
+        # Backpropagation - output layer deltas, then walk back through hidden layers
+        self.layers[-1].scale_delta(error, layer_outputs[-1])
+        for layer_idx in range(len(self.layers) - 1, -1, -1):
+            layer = self.layers[layer_idx]
+            layer_input = layer_outputs[layer_idx]
+            delta = batch_deltas[layer_idx]
+            
+            # Propagate the deltas with the weights used in the forward pass
+            if layer_idx > 0:
+                previous_delta = np.matmul(delta, layer.W, out=batch_deltas[layer_idx - 1])
+                self.layers[layer_idx - 1].scale_delta(previous_delta, layer_input)
+            
+            # Update weights and biases with the gradient averaged over the batch:
+            # a single (n_out, batch) @ (batch, n_in) gemm, scaled in place
+            weight_gradient = delta.T @ layer_input
+            weight_gradient *= effective_lr
+            layer.W += weight_gradient
+            layer.b += delta.sum(axis=0) * effective_lr
+        
+        return total_error
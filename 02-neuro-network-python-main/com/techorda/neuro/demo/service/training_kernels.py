@@ -0,0 +1,172 @@
+# python
+"""
+Compiled training kernels for a tanh hidden layer followed by a linear
+output layer. Numba is an optional dependency: when it is not installed
+NUMBA_AVAILABLE is False and NeuronNetwork trains with plain NumPy.
+"""
+import math
+import numpy as np
+
+try:
+    from numba import get_num_threads, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def get_num_threads():
+        return 1
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+# Smallest number of samples worth handing to a separate thread
+MIN_SAMPLES_PER_THREAD = 256
+
+# tanh(z) rounds to +/-1 in double precision well before |z| = 20; clipping
+# there keeps exp finite, which fastmath is allowed to assume
+TANH_SATURATION = 20.0
+
+
+@njit(cache=True, fastmath=True)
+def rational_tanh(z):
+    """
+    Rational (Lambert continued fraction) approximation of tanh, saturated
+    to +/-1 where it crosses 1. Max absolute error is about 1e-4.
+    """
+    if z >= 4.97:
+        return 1.0
+    if z <= -4.97:
+        return -1.0
+    z2 = z * z
+    return z * (135135.0 + z2 * (17325.0 + z2 * (378.0 + z2))) / (
+        135135.0 + z2 * (62370.0 + z2 * (3150.0 + 28.0 * z2))
+    )
+
+
+@njit(cache=True, fastmath=True)
+def accumulate_gradients(X, Y, W1, b1, W2, b2, samples, fast_tanh,
+                         hidden, delta_out, grad_W1, grad_b1, grad_W2, grad_b2):
+    """
+    Forward and backward pass over the given sample indices, adding their
+    gradients into grad_W1, grad_b1, grad_W2 and grad_b2.
+    Returns the total squared error of the samples.
+    """
+    n_in = X.shape[1]
+    n_hidden = W1.shape[0]
+    n_out = W2.shape[0]
+    total_error = 0.0
+
+    for n in samples:
+        # Forward propagation
+        for j in range(n_hidden):
+            z = b1[j]
+            for k in range(n_in):
+                z += W1[j, k] * X[n, k]
+            if fast_tanh:
+                hidden[j] = rational_tanh(z)
+            else:
+                # tanh(z) = 1 - 2 / (e^(2z) + 1): libm exp is much cheaper
+                # than libm tanh, which otherwise dominates the kernel
+                z = min(max(z, -TANH_SATURATION), TANH_SATURATION)
+                hidden[j] = 1.0 - 2.0 / (math.exp(z + z) + 1.0)
+
+        for m in range(n_out):
+            z = b2[m]
+            for j in range(n_hidden):
+                z += W2[m, j] * hidden[j]
+            # Linear output: the delta is just the error
+            delta_out[m] = Y[n, m] - z
+            total_error += delta_out[m] * delta_out[m]
+            grad_b2[m] += delta_out[m]
+            for j in range(n_hidden):
+                grad_W2[m, j] += delta_out[m] * hidden[j]
+
+        # Backpropagation into the tanh layer
+        for j in range(n_hidden):
+            weighted_delta_sum = 0.0
+            for m in range(n_out):
+                weighted_delta_sum += delta_out[m] * W2[m, j]
+            delta = weighted_delta_sum * (1.0 - hidden[j] * hidden[j])
+            grad_b1[j] += delta
+            for k in range(n_in):
+                grad_W1[j, k] += delta * X[n, k]
+
+    return total_error
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def train_tanh_linear(X, Y, W1, b1, W2, b2, epochs, learning_rate, batch_size,
+                      fast_tanh=False, num_threads=1, seed=-1):
+    """
+    Gradient descent over X (N, n_in) / Y (N, n_out), updating
+    W1 (n_hidden, n_in), b1, W2 (n_out, n_hidden) and b2 in place once per
+    batch. With batch_size < N the samples are reshuffled every epoch.
+    fast_tanh swaps the exact tanh for rational_tanh.
+    Batches large enough are split into up to num_threads chunks that run
+    in parallel, each accumulating into its own gradient buffers.
+    A non-negative seed seeds the generator used for the reshuffles, so
+    mini-batch runs are reproducible.
+    Returns the total squared error of every epoch.
+    """
+    num_samples, n_in = X.shape
+    n_hidden = W1.shape[0]
+    n_out = W2.shape[0]
+
+    # Per-thread scratch and gradient buffers
+    hidden = np.empty((num_threads, n_hidden), dtype=X.dtype)
+    delta_out = np.empty((num_threads, n_out), dtype=X.dtype)
+    grad_W1 = np.empty((num_threads, n_hidden, n_in), dtype=W1.dtype)
+    grad_b1 = np.empty((num_threads, n_hidden), dtype=b1.dtype)
+    grad_W2 = np.empty((num_threads, n_out, n_hidden), dtype=W2.dtype)
+    grad_b2 = np.empty((num_threads, n_out), dtype=b2.dtype)
+    chunk_errors = np.empty(num_threads, dtype=np.float64)
+    errors = np.empty(epochs, dtype=np.float64)
+
+    order = np.arange(num_samples)
+    if seed >= 0:
+        np.random.seed(seed)
+
+    for epoch in range(epochs):
+        if batch_size < num_samples:
+            np.random.shuffle(order)
+        total_error = 0.0
+
+        for start in range(0, num_samples, batch_size):
+            end = min(start + batch_size, num_samples)
+            num_chunks = max(1, min(num_threads, (end - start) // MIN_SAMPLES_PER_THREAD))
+            grad_W1[:num_chunks] = 0.0
+            grad_b1[:num_chunks] = 0.0
+            grad_W2[:num_chunks] = 0.0
+            grad_b2[:num_chunks] = 0.0
+
+            if num_chunks == 1:
+                # Not worth a parallel region for a single chunk
+                chunk_errors[0] = accumulate_gradients(
+                    X, Y, W1, b1, W2, b2, order[start:end], fast_tanh,
+                    hidden[0], delta_out[0], grad_W1[0], grad_b1[0], grad_W2[0], grad_b2[0],
+                )
+            else:
+                chunk_size = (end - start + num_chunks - 1) // num_chunks
+                for c in prange(num_chunks):
+                    chunk_start = start + c * chunk_size
+                    chunk_end = min(chunk_start + chunk_size, end)
+                    chunk_errors[c] = accumulate_gradients(
+                        X, Y, W1, b1, W2, b2, order[chunk_start:chunk_end], fast_tanh,
+                        hidden[c], delta_out[c], grad_W1[c], grad_b1[c], grad_W2[c], grad_b2[c],
+                    )
+
+            # Update weights and biases with the gradient averaged over the batch
+            step = learning_rate / (end - start)
+            for c in range(num_chunks):
+                W1 += step * grad_W1[c]
+                b1 += step * grad_b1[c]
+                W2 += step * grad_W2[c]
+                b2 += step * grad_b2[c]
+                total_error += chunk_errors[c]
+
+        errors[epoch] = total_error
+
+    return errors
@@ -5,6 +5,7 @@ import streamlit as st
 import pandas as pd
 from rag_pipeline import RAGPipeline
 from config import Config
+import threading
 import time
 
 
@@ -52,6 +53,64 @@ def get_rag_pipeline():
     return RAGPipeline()
 
 
+# The caching and streaming code below (run_retrieval, AnswerCache and the
+# answer rendering in main) is duplicated in 04-rag-advanced/app.py; the two
+# projects are run separately, so keep both copies identical when changing it.
+
+# Retrievals and the answers generated from them expire together
+CACHE_TTL_SECONDS = 3600
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=256, show_spinner=False)
+def run_retrieval(query: str, top_k: int, expand_query: bool):
+    """Expand the query and retrieve documents, caching the result so repeated questions return instantly."""
+    return get_rag_pipeline().retrieve(
+        user_query=query,
+        expand_query=expand_query,
+        top_k=top_k
+    )
+
+
+MAX_CACHED_ANSWERS = 256
+
+
+class AnswerCache:
+    """
+    Generated answers shared across sessions, keyed like run_retrieval().
+    Entries expire after CACHE_TTL_SECONDS and the oldest is evicted first;
+    a lock serializes sessions writing at the same time.
+    """
+
+    def __init__(self):
+        self._answers = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._answers.get(key)
+            if entry is None:
+                return None
+            stored_at, answer = entry
+            if time.monotonic() - stored_at > CACHE_TTL_SECONDS:
+                del self._answers[key]
+                return None
+            return answer
+
+    def put(self, key, answer):
+        with self._lock:
+            # Re-inserting moves the key to the end of the eviction order
+            self._answers.pop(key, None)
+            self._answers[key] = (time.monotonic(), answer)
+            while len(self._answers) > MAX_CACHED_ANSWERS:
+                self._answers.pop(next(iter(self._answers)))
+
+
+@st.cache_resource
+def get_answer_cache():
+    """The AnswerCache shared by all sessions."""
+    return AnswerCache()
+
+
 def format_metadata(doc):
     """Format document metadata for display."""
     return f"{doc['bank_name']} | {doc['quarter']} {doc['year']} | {doc['report_type'].replace('_', ' ').title()}"
@@ -139,15 +198,11 @@ def main():
         try:
             # Initialize RAG pipeline
             with st.spinner("🔄 Initializing RAG pipeline..."):
-                rag = get_rag_pipeline()
+                get_rag_pipeline()
             
             # Execute query
             with st.spinner("🔍 Searching financial reports..."):
-                result = rag.query(
-                    user_query=query,
-                    expand_query=expand_query,
-                    top_k=top_k
-                )
+                result = run_retrieval(query, top_k, expand_query)
             
             # Display results
             st.success(f"✅ Found {result['num_sources']} relevant documents in {result['processing_time']:.2f}s")
@@ -160,9 +215,26 @@ def main():
             # Answer section
             st.markdown("---")
             st.subheader("💬 Answer")
-            st.markdown(f"""
+            answers = get_answer_cache()
+            cache_key = (query, top_k, expand_query)
+            answer_slot = st.empty()
+            generation_start = time.time()
+            answer = answers.get(cache_key)
+            if answer is None:
+                # Show the answer token by token while it is generated; only
+                # answers that completed are cached
+                try:
+                    answer = answer_slot.write_stream(
+                        get_rag_pipeline().stream_answer(query, result['sources'])
+                    )
+                except Exception as e:
+                    answer = f"Error generating answer: {e}"
+                else:
+                    answers.put(cache_key, answer)
+            processing_time = result['processing_time'] + time.time() - generation_start
+            answer_slot.markdown(f"""
             <div class="metric-card">
-                {result['answer']}
+                {answer}
             </div>
             """, unsafe_allow_html=True)
             
@@ -217,10 +289,10 @@ def main():
             with st.expander("ℹ️ Query Metadata"):
                 meta_col1, meta_col2 = st.columns(2)
                 with meta_col1:
-                    st.write(f"**Model**: {result['model']}")
+                    st.write(f"**Model**: {Config.CHAT_MODEL}")
                     st.write(f"**Documents Retrieved**: {result['num_sources']}")
                 with meta_col2:
-                    st.write(f"**Processing Time**: {result['processing_time']:.2f}s")
+                    st.write(f"**Processing Time**: {processing_time:.2f}s")
                     st.write(f"**Context Length**: {result['context_length']} characters")
         
         except Exception as e:
@@ -5,7 +5,7 @@ Handles query expansion, retrieval, and answer generation.
 import anthropic
 import weaviate
 import weaviate.classes as wvc
-from typing import List, Dict
+from typing import Dict, Iterator, List, Tuple
 import time
 from config import Config
 from embeddings import EmbeddingModel
@@ -97,14 +97,18 @@ class RAGPipeline:
             documents.append(doc)
         return documents
 
-    def generate_answer(self, query: str, documents: List[Dict]) -> Dict:
+    def _build_context(self, documents: List[Dict]) -> str:
         context_parts = []
         for i, doc in enumerate(documents, 1):
             context_parts.append(
                 f"Document {i} ({doc['bank_name']} - {doc['quarter']} {doc['year']} - {doc['report_type']}):\n"
                 f"{doc['content']}\n"
             )
-        context = "\n---\n".join(context_parts)
+        return "\n---\n".join(context_parts)
+
+    def _generation_prompt(self, query: str, documents: List[Dict]) -> Tuple[str, str]:
+        """Build the answer-generation prompt; returns (prompt, context)."""
+        context = self._build_context(documents)
         generation_prompt = f"""You are a financial analyst assistant.Your task is to answer questions about bank financial reports based ONLY on the provided context.
             Context (Retrieved Financial Reports):
             {context}
@@ -118,6 +122,10 @@ class RAGPipeline:
             6.Format numbers clearly with appropriate separators and units
             7.Be concise but comprehensive
             Answer:"""
+        return generation_prompt, context
+
+    def generate_answer(self, query: str, documents: List[Dict]) -> Dict:
+        generation_prompt, context = self._generation_prompt(query, documents)
         try:
             message = self.anthropic_client.messages.create(
                 model=Config.CHAT_MODEL,
@@ -140,7 +148,24 @@ class RAGPipeline:
                 "model": Config.CHAT_MODEL
             }
 
-    def query(self, user_query: str, expand_query: bool = True, top_k: int = None) -> Dict:
+    def stream_answer(self, query: str, documents: List[Dict]) -> Iterator[str]:
+        """
+        Generate the answer like generate_answer(), yielding text chunks as
+        the model produces them so a UI can show the first tokens early.
+        API errors are raised rather than yielded as text, so a failed
+        generation cannot be mistaken for (and cached as) an answer.
+        """
+        generation_prompt, _ = self._generation_prompt(query, documents)
+        with self.anthropic_client.messages.stream(
+            model=Config.CHAT_MODEL,
+            max_tokens=1500,
+            temperature=0.1,
+            messages=[{"role": "user", "content": generation_prompt}]
+        ) as stream:
+            yield from stream.text_stream
+
+    def retrieve(self, user_query: str, expand_query: bool = True, top_k: int = None) -> Dict:
+        """Query expansion and retrieval, i.e. query() without answer generation."""
         start_time = time.time()
         if expand_query:
             expanded_query = self.expand_query(user_query)
@@ -150,13 +175,21 @@ class RAGPipeline:
             search_query = user_query
         query_vector = self.embedding_model.encode(search_query)
         documents = self.retrieve_documents(query_vector, top_k)
-        result = self.generate_answer(user_query, documents)
-        result.update({
+        return {
+            "sources": documents,
             "original_query": user_query,
             "expanded_query": expanded_query,
             "num_sources": len(documents),
+            "context_length": len(self._build_context(documents)),
             "processing_time": time.time() - start_time
-        })
+        }
+
+    def query(self, user_query: str, expand_query: bool = True, top_k: int = None) -> Dict:
+        start_time = time.time()
+        retrieval = self.retrieve(user_query, expand_query, top_k)
+        result = self.generate_answer(user_query, retrieval["sources"])
+        result.update(retrieval)
+        result["processing_time"] = time.time() - start_time
         return result
 
     def close(self):
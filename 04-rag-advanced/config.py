@@ -28,6 +28,14 @@ class Config:
     TOP_K_RESULTS = int(os.getenv("TOP_K_RESULTS", "5"))
     SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.7"))
     
+    # Evaluation Configuration
+    EVAL_MAX_CONCURRENCY = int(os.getenv("EVAL_MAX_CONCURRENCY", "5"))
+    EVAL_RETRIEVAL_CONCURRENCY = int(os.getenv("EVAL_RETRIEVAL_CONCURRENCY", "5"))
+    EVAL_JUDGE_CACHE = os.getenv("EVAL_JUDGE_CACHE", ".judge_cache")
+    
+    # Re-ranking Configuration (empty path disables the score cache)
+    SCORER_CACHE_PATH = os.getenv("SCORER_CACHE_PATH", ".scorer_cache.db")
+    
     # Weaviate Collection
     COLLECTION_NAME = "FinancialReports"
     
@@ -2,12 +2,22 @@
 Shared embedding utility for consistent embeddings across ingestion and retrieval. 
 """
 from sentence_transformers import SentenceTransformer
+from collections import OrderedDict
 from typing import List, Union
+import hashlib
+import threading
 import numpy as np
 
+# encode() kwargs that do not change the vectors, so results stay cacheable
+_CACHE_NEUTRAL_PARAMS = {'show_progress_bar', 'batch_size'}
+
 class EmbeddingModel:
     _instance = None
     _model = None
+    # LRU of float32 embeddings keyed by a hash of the text, shared by all users of the singleton
+    _cache = None
+    _cache_lock = threading.Lock()
+    cache_size = 4096
     
     def __new__(cls):
         if cls._instance is None:
@@ -19,17 +29,24 @@ class EmbeddingModel:
             print("📥 Loading embedding model (all-MiniLM-L6-v2)...")
             self._model = SentenceTransformer('all-MiniLM-L6-v2')
             print("   ✅ Model loaded")
+            EmbeddingModel._cache = OrderedDict()
     
-    def encode(self, texts: Union[List[str], str], **kwargs) -> Union[List[List[float]], List[float]]:
+    def encode(self, texts: Union[List[str], str], use_cache: bool = True,
+               **kwargs) -> Union[List[List[float]], List[float]]:
         """Encode texts into embeddings. 
         
         Args:
             texts: Single text string or list of texts
+            use_cache: Serve texts embedded before from the in-memory LRU and
+                       remember new ones; pass False for one-off texts such as
+                       documents being ingested, so they don't evict queries
             **kwargs: Additional arguments passed to SentenceTransformer. encode()
                      (e. g., show_progress_bar, batch_size, etc.)
         
         Returns:
             Single embedding vector (list of floats) or list of embedding vectors
+        
+        The cache is only used with the default output options.
         """
         if isinstance(texts, str):
             texts = [texts]
@@ -45,16 +62,50 @@ class EmbeddingModel:
         }
         encode_params.update(kwargs)  # Override with any user-provided kwargs
         
+        if use_cache and kwargs.keys() <= _CACHE_NEUTRAL_PARAMS:
+            result = self._encode_cached(texts, encode_params)
+        else:
+            result = self._encode_uncached(texts, encode_params)
+        
+        # Return single embedding or list of embeddings
+        return result[0] if single else result
+    
+    def _encode_uncached(self, texts: List[str], encode_params: dict) -> List[List[float]]:
         embeddings = self._model.encode(texts, **encode_params)
         
         # Convert to list - handle both numpy arrays and lists
         if isinstance(embeddings, np.ndarray):
-            result = embeddings.tolist()
-        else:
-            result = embeddings
+            return embeddings.tolist()
+        return embeddings
+    
+    def _encode_cached(self, texts: List[str], encode_params: dict) -> List[List[float]]:
+        """Encode only the texts missing from the LRU and stitch the results back in order."""
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        vectors = {}
+        with self._cache_lock:
+            for key in keys:
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    vectors[key] = vector
         
-        # Return single embedding or list of embeddings
-        return result[0] if single else result
+        # A text repeated within the batch is encoded once
+        misses = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if misses:
+            embeddings = np.asarray(
+                self._model.encode(list(misses.values()), **encode_params), dtype=np.float32
+            )
+            with self._cache_lock:
+                for key, embedding in zip(misses, embeddings):
+                    # A read-only copy per row: callers cannot mutate a shared
+                    # vector, and a cached row doesn't keep its whole batch alive
+                    embedding = embedding.copy()
+                    embedding.flags.writeable = False
+                    vectors[key] = self._cache[key] = embedding
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        return np.stack([vectors[key] for key in keys]).tolist()
     
     @property
     def dimension(self) -> int:
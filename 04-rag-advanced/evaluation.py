@@ -3,32 +3,37 @@ Automated evaluation pipeline for RAG system.
 Measures Answer Relevancy and Context Precision using LLM-as-judge.
 """
 import anthropic
+import asyncio
+import hashlib
+import jiter
 import json
+import logging
+import numpy as np
+import shelve
 import time
-from typing import List, Dict, Tuple
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from config import Config
 from test_dataset import TestDataset
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
 
-class RAGEvaluator:
-    """Automated evaluation system for RAG pipeline."""
-    
-    def __init__(self):
-        self.anthropic_client = anthropic.Anthropic(api_key=Config.ANTHROPIC_API_KEY)
-        self.test_queries = TestDataset.get_test_queries()
-    
-    def evaluate_answer_relevancy(self, query: str, answer: str, expected_answer: str) -> Dict:
-        """
-        Evaluate if the answer is relevant to the query.
-        Uses LLM-as-judge to score on scale 0-100.
-        """
-        prompt = f"""You are an expert financial analyst evaluating the quality of AI-generated answers.
+try:
+    from rich.progress import Progress
+except ImportError:  # optional: run without a progress bar
+    Progress = None
 
-QUERY: {query}
+log = logging.getLogger(__name__)
 
-EXPECTED ANSWER: {expected_answer}
 
-ACTUAL ANSWER: {answer}
+# The rubric is the same for every answer, so it is sent as a cacheable
+# system prompt and only the query and answers vary per request
+JUDGE_SYSTEM_PROMPT = """You are an expert financial analyst evaluating the quality of AI-generated answers.
+
+You will be given a QUERY, its EXPECTED ANSWER and the ACTUAL ANSWER to evaluate.
 
 Evaluate the ACTUAL ANSWER on the following criteria:
 1. **Accuracy**: Does it provide correct information? (0-40 points)
@@ -36,53 +41,175 @@ Evaluate the ACTUAL ANSWER on the following criteria:
 3. **Relevance**: Is it focused on what was asked? (0-30 points)
 
 Provide your evaluation in this exact JSON format:
-{{
+{
   "accuracy_score": <0-40>,
   "completeness_score": <0-30>,
   "relevance_score": <0-30>,
   "total_score": <0-100>,
   "reasoning": "<brief explanation>"
-}}
+}
 
 Be strict but fair. Consider:
 - For fact lookups: exact numbers matter
 - For comparisons: all requested entities should be compared
 - For trends: temporal changes should be described
 """
+
+_JUDGE_SYSTEM = [{"type": "text", "text": JUDGE_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+# The judge is made to answer through this tool, so the verdict arrives as
+# already-parsed tool input instead of JSON embedded in prose
+_RECORD_SCORE_TOOL = {
+    "name": "record_score",
+    "description": "Record the evaluation of the ACTUAL ANSWER.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "accuracy_score": {"type": "integer", "minimum": 0, "maximum": 40},
+            "completeness_score": {"type": "integer", "minimum": 0, "maximum": 30},
+            "relevance_score": {"type": "integer", "minimum": 0, "maximum": 30},
+            "total_score": {"type": "integer", "minimum": 0, "maximum": 100},
+            "reasoning": {"type": "string", "description": "Brief explanation"}
+        },
+        "required": ["accuracy_score", "completeness_score", "relevance_score", "total_score", "reasoning"]
+    }
+}
+
+# Request parameters shared by direct and batched judge calls
+_JUDGE_PARAMS = {
+    "model": Config.CHAT_MODEL,
+    "max_tokens": 512,
+    "temperature": 0,
+    "system": _JUDGE_SYSTEM,
+    "tools": [_RECORD_SCORE_TOOL],
+    "tool_choice": {"type": "tool", "name": "record_score"}
+}
+
+
+class RAGEvaluator:
+    """Automated evaluation system for RAG pipeline."""
+    
+    def __init__(self, max_concurrency: int = Config.EVAL_MAX_CONCURRENCY,
+                 use_cache: bool = True, cache_path: str = Config.EVAL_JUDGE_CACHE,
+                 results_log: Optional[str] = None,
+                 retrieval_concurrency: int = Config.EVAL_RETRIEVAL_CONCURRENCY):
+        self.anthropic_client = anthropic.AsyncAnthropic(api_key=Config.ANTHROPIC_API_KEY)
+        self.test_queries = TestDataset.get_test_queries()
+        # Judge calls and RAG queries in flight are limited separately,
+        # so the judge API and the retrieval stack can be tuned independently
+        self.max_concurrency = max_concurrency
+        self.retrieval_concurrency = retrieval_concurrency
+        # One loop per evaluator so the async client's connection pool
+        # is reused across evaluate_pipeline() calls
+        self._loop = asyncio.new_event_loop()
+        # Judge verdicts persisted across runs, keyed by _judge_cache_key()
+        self._judge_cache = shelve.open(cache_path) if use_cache else None
+        # Optional NDJSON file that gets each query result as soon as it completes,
+        # so an interrupted run keeps everything evaluated so far
+        self._results_log = open(results_log, 'ab') if results_log else None
+    
+    @staticmethod
+    def _judge_prompt(query: str, answer: str, expected_answer: str) -> str:
+        """Build the per-answer part of the judge prompt; the rubric is JUDGE_SYSTEM_PROMPT."""
+        return f"QUERY: {query}\n\nEXPECTED ANSWER: {expected_answer}\n\nACTUAL ANSWER: {answer}"
+    
+    @staticmethod
+    def _parse_judge_response(response_text: str) -> Dict:
+        """Extract the judge's JSON verdict from a plain-text reply."""
+        # Partial mode stops after the first JSON value, so prose after the
+        # object is ignored, and a reply cut off by max_tokens keeps the
+        # fields written so far
+        start_idx = response_text.find('{')
+        if start_idx < 0:
+            raise ValueError("Judge reply contains no JSON object")
+        result = jiter.from_json(
+            response_text[start_idx:].encode(),
+            partial_mode="trailing-strings",
+            allow_inf_nan=False
+        )
+        return RAGEvaluator._verdict(result)
+    
+    @staticmethod
+    def _verdict_from_message(message) -> Dict:
+        """
+        Read the verdict from the judge's record_score call, falling back
+        to parsing the text reply for models that answer without the tool.
+        """
+        for block in message.content:
+            if block.type == "tool_use" and block.name == "record_score":
+                return RAGEvaluator._verdict(block.input)
+        text = "".join(block.text for block in message.content if block.type == "text")
+        return RAGEvaluator._parse_judge_response(text)
+    
+    @staticmethod
+    def _verdict(result: Dict) -> Dict:
+        """Map the judge's score fields to the verdict dict."""
+        return {
+            "accuracy": result["accuracy_score"],
+            "completeness": result["completeness_score"],
+            "relevance": result["relevance_score"],
+            "total": result["total_score"],
+            "reasoning": result["reasoning"]
+        }
+    
+    @staticmethod
+    def _failed_judgement(error) -> Dict:
+        """Zero scores for an answer the judge could not evaluate."""
+        log.warning("Answer relevancy evaluation failed: %s", error)
+        return {
+            "accuracy": 0,
+            "completeness": 0,
+            "relevance": 0,
+            "total": 0,
+            "reasoning": f"Evaluation failed: {str(error)}"
+        }
+    
+    @staticmethod
+    def _judge_cache_key(query: str, answer: str, expected_answer: str) -> str:
+        """Cache key for a verdict; includes the judge model and rubric so changing either re-judges."""
+        text = f"{Config.CHAT_MODEL}|{JUDGE_SYSTEM_PROMPT}|{query}|{answer}|{expected_answer}"
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    
+    def _cached_verdict(self, cache_key: str) -> Optional[Dict]:
+        if self._judge_cache is None:
+            return None
+        return self._judge_cache.get(cache_key)
+    
+    def _store_verdict(self, cache_key: str, verdict: Dict, message=None):
+        """
+        Cache a verdict. A reply cut off at max_tokens was only partially
+        parsed, so it is used for this run but not persisted.
+        """
+        if message is not None and getattr(message, "stop_reason", None) == "max_tokens":
+            log.warning("Judge reply truncated at max_tokens; verdict not cached")
+            return
+        if self._judge_cache is not None:
+            self._judge_cache[cache_key] = verdict
+    
+    async def evaluate_answer_relevancy(self, query: str, answer: str, expected_answer: str) -> Dict:
+        """
+        Evaluate if the answer is relevant to the query.
+        Uses LLM-as-judge to score on scale 0-100.
+        Verdicts for an answer judged before are served from the cache.
+        """
+        cache_key = self._judge_cache_key(query, answer, expected_answer)
+        cached = self._cached_verdict(cache_key)
+        if cached is not None:
+            return cached
         
         try:
-            message = self.anthropic_client.messages.create(
-                model=Config.CHAT_MODEL,
-                max_tokens=1024,
-                temperature=0,
-                messages=[{"role": "user", "content": prompt}]
+            message = await self.anthropic_client.messages.create(
+                **_JUDGE_PARAMS,
+                messages=[{"role": "user", "content": self._judge_prompt(query, answer, expected_answer)}]
             )
             
-            response_text = message.content[0].text
-            
-            # Extract JSON from response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            json_str = response_text[start_idx:end_idx]
-            
-            result = json.loads(json_str)
-            return {
-                "accuracy": result["accuracy_score"],
-                "completeness": result["completeness_score"],
-                "relevance": result["relevance_score"],
-                "total": result["total_score"],
-                "reasoning": result["reasoning"]
-            }
+            verdict = self._verdict_from_message(message)
         
         except Exception as e:
-            print(f"⚠️  Error in answer relevancy evaluation: {e}")
-            return {
-                "accuracy": 0,
-                "completeness": 0,
-                "relevance": 0,
-                "total": 0,
-                "reasoning": f"Evaluation failed: {str(e)}"
-            }
+            return self._failed_judgement(e)
+        
+        self._store_verdict(cache_key, verdict, message)
+        return verdict
     
     def evaluate_context_precision(self, query: str, sources: List[Dict], 
                                    expected_banks: List[str], 
@@ -102,27 +229,31 @@ Be strict but fair. Consider:
                 "reasoning": "No sources retrieved"
             }
         
-        # Check metadata match
-        relevant_count = 0
-        for doc in sources:
-            bank_match = doc.get('bank_name') in expected_banks
-            quarter_match = doc.get('quarter') in expected_quarters
-            year_match = doc.get('year') in expected_years
-            
-            # A document is relevant if it matches the expected criteria
-            if bank_match and quarter_match and year_match:
-                relevant_count += 1
+        # Check metadata match against sets built once per query
+        bank_set = frozenset(expected_banks)
+        quarter_set = frozenset(expected_quarters)
+        year_set = frozenset(expected_years)
+        # A document is relevant if it matches the expected criteria;
+        # later checks are skipped as soon as one fails
+        relevant_count = sum(
+            1 for doc in sources
+            if doc.get('bank_name') in bank_set
+            and doc.get('quarter') in quarter_set
+            and doc.get('year') in year_set
+        )
         
+        # sources is non-empty here; the max() guards stand in for the
+        # zero-division checks when a query expects no banks or quarters
         total_docs = len(sources)
-        precision = relevant_count / total_docs if total_docs > 0 else 0
+        precision = relevant_count / total_docs
         
         # Recall: how many of the expected documents were retrieved
         # For simplicity, we estimate based on number of expected banks/quarters
         expected_docs = len(expected_banks) * len(expected_quarters)
-        recall = relevant_count / expected_docs if expected_docs > 0 else 0
+        recall = relevant_count / max(expected_docs, 1)
         
         # F1 score
-        f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+        f1 = 2 * precision * recall / max(precision + recall, 1e-12)
         
         return {
             "precision": precision,
@@ -133,54 +264,81 @@ Be strict but fair. Consider:
             "reasoning": f"{relevant_count}/{total_docs} documents matched expected criteria"
         }
     
-    def evaluate_single_query(self, rag_pipeline, test_query: Dict) -> Dict:
-        """Evaluate RAG pipeline on a single test query."""
-        query = test_query["query"]
-        
-        print(f"\n🔍 Evaluating: {query}")
-        
-        # Get RAG result
+    async def _run_rag_query(self, rag_pipeline, test_query: Dict) -> Tuple[Dict, float]:
+        """Get the RAG result; the pipeline is synchronous, so run it in a worker thread."""
         start_time = time.time()
-        try:
-            result = rag_pipeline.query(
-                user_query=query,
-                expand_query=True,
-                top_k=5
-            )
-            processing_time = time.time() - start_time
-        except Exception as e:
-            print(f"   ❌ Query failed: {e}")
-            return {
-                "query_id": test_query["id"],
-                "query": query,
-                "success": False,
-                "error": str(e),
-                "processing_time": 0
-            }
-        
-        # Evaluate answer relevancy
-        answer_eval = self.evaluate_answer_relevancy(
-            query=query,
-            answer=result["answer"],
-            expected_answer=test_query["expected_answer"]
+        result = await asyncio.to_thread(
+            rag_pipeline.query,
+            user_query=test_query["query"],
+            expand_query=True,
+            top_k=5
         )
-        
-        # Evaluate context precision
-        context_eval = self.evaluate_context_precision(
-            query=query,
-            sources=result["sources"],
-            expected_banks=test_query["expected_banks"],
-            expected_quarters=test_query["expected_quarters"],
-            expected_years=test_query["expected_years"]
+        return result, time.time() - start_time
+    
+    def _log_result(self, result: Dict) -> Dict:
+        """Append a query result to the NDJSON results log, if one is open."""
+        if self._results_log is not None:
+            if orjson is not None:
+                line = orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)
+            else:
+                line = json.dumps(result, ensure_ascii=False).encode('utf-8')
+            self._results_log.write(line + b"\n")
+            self._results_log.flush()
+        return result
+    
+    def _failed_query(self, test_query: Dict, error: Exception) -> Dict:
+        """Result entry for a query the RAG pipeline failed to answer."""
+        log.warning(
+            "[%s] query failed: %s", test_query["id"], error,
+            extra={"query_id": test_query["id"]}
+        )
+        return self._log_result({
+            "query_id": test_query["id"],
+            "query": test_query["query"],
+            "success": False,
+            "error": str(error),
+            "error_stage": "retrieval",
+            "processing_time": 0
+        })
+    
+    def _failed_judging(self, test_query: Dict, result: Dict, processing_time: float,
+                        error: Exception) -> Dict:
+        """
+        Result entry for a RAG result that could not be scored. The answer
+        and its timing are kept, so a judging bug is not mistaken for a
+        retrieval failure.
+        """
+        log.warning(
+            "[%s] judging failed: %s", test_query["id"], error,
+            extra={"query_id": test_query["id"]}
+        )
+        return self._log_result({
+            "query_id": test_query["id"],
+            "query": test_query["query"],
+            "query_type": test_query["type"],
+            "complexity": test_query["complexity"],
+            "success": False,
+            "error": str(error),
+            "error_stage": "judge",
+            "processing_time": processing_time,
+            "num_sources": len(result.get("sources") or ()),
+            "answer": result.get("answer"),
+            "expected_answer": test_query["expected_answer"]
+        })
+    
+    def _query_result(self, test_query: Dict, result: Dict, processing_time: float,
+                      answer_eval: Dict, context_eval: Dict) -> Dict:
+        """Result entry for an evaluated query."""
+        # One log record per query so concurrent evaluations don't interleave
+        log.info(
+            "[%s] answer relevancy %s/100, context precision %.2f%%, %.2fs",
+            test_query["id"], answer_eval["total"], context_eval["precision"] * 100, processing_time,
+            extra={"query_id": test_query["id"], "score": answer_eval["total"]}
         )
         
-        print(f"   📊 Answer Relevancy: {answer_eval['total']}/100")
-        print(f"   📊 Context Precision: {context_eval['precision']:.2%}")
-        print(f"   ⏱️  Time: {processing_time:.2f}s")
-        
-        return {
+        return self._log_result({
             "query_id": test_query["id"],
-            "query": query,
+            "query": test_query["query"],
             "query_type": test_query["type"],
             "complexity": test_query["complexity"],
             "success": True,
@@ -190,34 +348,203 @@ Be strict but fair. Consider:
             "num_sources": len(result["sources"]),
             "answer": result["answer"],
             "expected_answer": test_query["expected_answer"]
-        }
+        })
     
-    def evaluate_pipeline(self, rag_pipeline, sample_size: int = None) -> Dict:
+    def _context_eval(self, test_query: Dict, result: Dict) -> Dict:
+        """Context precision of a RAG result against the query's ground truth."""
+        return self.evaluate_context_precision(
+            query=test_query["query"],
+            sources=result["sources"],
+            expected_banks=test_query["expected_banks"],
+            expected_quarters=test_query["expected_quarters"],
+            expected_years=test_query["expected_years"]
+        )
+    
+    async def _judge_query(self, test_query: Dict, result: Dict, processing_time: float) -> Dict:
         """
-        Evaluate RAG pipeline on test dataset.
-        
-        Args:
-            rag_pipeline: RAG pipeline instance to evaluate
-            sample_size: Number of queries to test (None = all queries)
+        Score a RAG result for a test query. Does not raise: an error while
+        scoring becomes a _failed_judging() entry.
         """
-        queries_to_test = self.test_queries
-        if sample_size:
-            queries_to_test = self.test_queries[:sample_size]
+        answer_task = None
+        try:
+            # Evaluate answer relevancy; the judge request is started first
+            # so the local context check runs while it is in flight
+            answer_task = asyncio.create_task(self.evaluate_answer_relevancy(
+                query=test_query["query"],
+                answer=result["answer"],
+                expected_answer=test_query["expected_answer"]
+            ))
+            
+            # Evaluate context precision
+            context_eval = self._context_eval(test_query, result)
+            answer_eval = await answer_task
+            
+            return self._query_result(test_query, result, processing_time, answer_eval, context_eval)
+        except Exception as e:
+            if answer_task is not None:
+                answer_task.cancel()
+            return self._failed_judging(test_query, result, processing_time, e)
+    
+    async def _evaluate_single_query(self, rag_pipeline, test_query: Dict) -> Dict:
+        try:
+            result, processing_time = await self._run_rag_query(rag_pipeline, test_query)
+        except Exception as e:
+            return self._failed_query(test_query, e)
         
-        print(f"\n{'='*60}")
-        print(f"🧪 Starting RAG Evaluation")
-        print(f"{'='*60}")
-        print(f"Total queries: {len(queries_to_test)}")
+        return await self._judge_query(test_query, result, processing_time)
+    
+    def evaluate_single_query(self, rag_pipeline, test_query: Dict) -> Dict:
+        """Evaluate RAG pipeline on a single test query."""
+        return self._loop.run_until_complete(self._evaluate_single_query(rag_pipeline, test_query))
+    
+    @staticmethod
+    @contextmanager
+    def _progress(total: int) -> Iterator[Callable[[], None]]:
+        """Yield a callback that advances a progress bar by one query."""
+        if Progress is None:
+            yield lambda: None
+            return
+        with Progress(transient=True) as progress:
+            task = progress.add_task("Evaluating", total=total)
+            yield lambda: progress.update(task, advance=1)
+    
+    async def _evaluate_queries(self, rag_pipeline, queries_to_test,
+                                advance: Callable[[], None]) -> List[Dict]:
+        """
+        Evaluate queries as a two-stage pipeline: retrieval_concurrency
+        retrieval workers put RAG results on a queue and max_concurrency
+        judge workers drain it. A retrieval worker moves on to its next
+        query as soon as it has queued a result, so retrieval runs ahead
+        of judging instead of waiting for it.
+        Results keep the order of queries_to_test.
+        """
+        queue = asyncio.Queue(maxsize=2 * self.max_concurrency)
+        results = [None] * len(queries_to_test)
+        # Shared by all retrieval workers, so each query is taken once
+        pending = iter(enumerate(queries_to_test))
+        
+        async def retrieve():
+            for index, test_query in pending:
+                try:
+                    result, processing_time = await self._run_rag_query(rag_pipeline, test_query)
+                except Exception as e:
+                    results[index] = self._failed_query(test_query, e)
+                    advance()
+                    continue
+                await queue.put((index, test_query, result, processing_time))
+        
+        async def judge():
+            while True:
+                index, test_query, result, processing_time = await queue.get()
+                # _judge_query records its own failures, so the worker survives
+                # a bad item; task_done() still runs if the record itself fails
+                try:
+                    results[index] = await self._judge_query(test_query, result, processing_time)
+                finally:
+                    queue.task_done()
+                    advance()
+        
+        judges = [asyncio.create_task(judge()) for _ in range(self.max_concurrency)]
+        await asyncio.gather(*(retrieve() for _ in range(self.retrieval_concurrency)))
+        await queue.join()
+        for task in judges:
+            task.cancel()
+        await asyncio.gather(*judges, return_exceptions=True)
+        return results
+    
+    async def _judge_batch(self, requests: List[Dict], cache_keys: Dict[str, str],
+                           poll_interval: float) -> Dict[str, Dict]:
+        """
+        Submit judge prompts through the Message Batches API, wait for the
+        batch to end and return the parsed verdicts by custom_id.
+        Successful verdicts are cached under cache_keys[custom_id].
+        """
+        batches = self.anthropic_client.messages.batches
+        batch = await batches.create(requests=requests)
+        log.info("Submitted judge batch %s (%d requests)", batch.id, len(requests))
+        
+        while batch.processing_status != "ended":
+            await asyncio.sleep(poll_interval)
+            batch = await batches.retrieve(batch.id)
+        
+        verdicts = {}
+        async for entry in await batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                verdicts[entry.custom_id] = self._failed_judgement(f"batch request {entry.result.type}")
+                continue
+            try:
+                verdict = self._verdict_from_message(entry.result.message)
+            except Exception as e:
+                verdicts[entry.custom_id] = self._failed_judgement(e)
+                continue
+            self._store_verdict(cache_keys[entry.custom_id], verdict, entry.result.message)
+            verdicts[entry.custom_id] = verdict
+        return verdicts
+    
+    async def _evaluate_queries_batch(self, rag_pipeline, queries_to_test, poll_interval: float) -> List[Dict]:
+        """
+        Run every RAG query first (concurrently), then judge all answers
+        in a single message batch. Results keep the order of queries_to_test.
+        """
+        semaphore = asyncio.Semaphore(self.retrieval_concurrency)
+        
+        async def run_bounded(test_query: Dict):
+            async with semaphore:
+                try:
+                    return await self._run_rag_query(rag_pipeline, test_query)
+                except Exception as e:
+                    return e
+        
+        rag_outputs = await asyncio.gather(*(run_bounded(q) for q in queries_to_test))
+        
+        # Only answers without a cached verdict go into the batch
+        verdicts = {}
+        cache_keys = {}
+        requests = []
+        for test_query, output in zip(queries_to_test, rag_outputs):
+            if isinstance(output, Exception):
+                continue
+            custom_id = f"query-{test_query['id']}"
+            answer = output[0]["answer"]
+            cache_key = self._judge_cache_key(test_query["query"], answer, test_query["expected_answer"])
+            cached = self._cached_verdict(cache_key)
+            if cached is not None:
+                verdicts[custom_id] = cached
+                continue
+            cache_keys[custom_id] = cache_key
+            requests.append({
+                "custom_id": custom_id,
+                "params": {
+                    **_JUDGE_PARAMS,
+                    "messages": [{
+                        "role": "user",
+                        "content": self._judge_prompt(test_query["query"], answer, test_query["expected_answer"])
+                    }]
+                }
+            })
+        if requests:
+            verdicts.update(await self._judge_batch(requests, cache_keys, poll_interval))
         
         results = []
-        for i, test_query in enumerate(queries_to_test, 1):
-            print(f"\n[{i}/{len(queries_to_test)}]", end=" ")
-            result = self.evaluate_single_query(rag_pipeline, test_query)
-            results.append(result)
-            
-            # Small delay to avoid rate limiting
-            time.sleep(0.5)
-        
+        for test_query, output in zip(queries_to_test, rag_outputs):
+            if isinstance(output, Exception):
+                results.append(self._failed_query(test_query, output))
+                continue
+            result, processing_time = output
+            answer_eval = verdicts.get(f"query-{test_query['id']}")
+            if answer_eval is None:
+                answer_eval = self._failed_judgement("missing from batch results")
+            context_eval = self._context_eval(test_query, result)
+            results.append(self._query_result(test_query, result, processing_time, answer_eval, context_eval))
+        return results
+    
+    def _select_queries(self, sample_size: int = None):
+        if sample_size:
+            return self.test_queries[:sample_size]
+        return self.test_queries
+    
+    def _summarize(self, results: List[Dict]) -> Dict:
+        """Wrap per-query results with aggregate metrics."""
         # Calculate aggregate metrics
         metrics = self._calculate_aggregate_metrics(results)
         
@@ -230,6 +557,60 @@ Be strict but fair. Consider:
             "results": results
         }
     
+    def evaluate_pipeline(self, rag_pipeline, sample_size: int = None) -> Dict:
+        """
+        Evaluate RAG pipeline on test dataset.
+        
+        Args:
+            rag_pipeline: RAG pipeline instance to evaluate
+            sample_size: Number of queries to test (None = all queries)
+        """
+        queries_to_test = self._select_queries(sample_size)
+        
+        log.info(
+            "Starting RAG evaluation of %d queries (up to %d retrievals and %d judge calls at a time)",
+            len(queries_to_test), self.retrieval_concurrency, self.max_concurrency
+        )
+        
+        # Rate limiting is left to the client's built-in retry with backoff
+        with self._progress(len(queries_to_test)) as advance:
+            results = self._loop.run_until_complete(
+                self._evaluate_queries(rag_pipeline, queries_to_test, advance)
+            )
+        return self._summarize(results)
+    
+    def evaluate_pipeline_batch(self, rag_pipeline, sample_size: int = None,
+                                poll_interval: float = 30.0) -> Dict:
+        """
+        Evaluate RAG pipeline on test dataset, judging the answers through
+        the Message Batches API. Batches are billed at half price but can
+        take minutes to finish, so this suits offline runs; the result has
+        the same shape as evaluate_pipeline().
+        
+        Args:
+            rag_pipeline: RAG pipeline instance to evaluate
+            sample_size: Number of queries to test (None = all queries)
+            poll_interval: Seconds between batch status checks
+        """
+        queries_to_test = self._select_queries(sample_size)
+        
+        log.info("Starting RAG evaluation of %d queries (batch judging)", len(queries_to_test))
+        
+        results = self._loop.run_until_complete(
+            self._evaluate_queries_batch(rag_pipeline, queries_to_test, poll_interval)
+        )
+        return self._summarize(results)
+    
+    @staticmethod
+    def _summary_stats(values: np.ndarray) -> Dict:
+        """Mean, median, min and max of a non-empty score array."""
+        return {
+            "mean": float(values.mean()),
+            "median": float(np.median(values)),
+            "min": float(values.min()),
+            "max": float(values.max())
+        }
+    
     def _calculate_aggregate_metrics(self, results: List[Dict]) -> Dict:
         """Calculate aggregate metrics from individual results."""
         successful_results = [r for r in results if r["success"]]
@@ -241,67 +622,57 @@ Be strict but fair. Consider:
                 "processing_time": {"mean": 0, "median": 0, "min": 0, "max": 0}
             }
         
-        # Answer relevancy scores
-        relevancy_scores = [r["answer_relevancy"]["total"] for r in successful_results]
-        
-        # Context precision scores
-        precision_scores = [r["context_precision"]["precision"] for r in successful_results]
-        
-        # Processing times
-        times = [r["processing_time"] for r in successful_results]
-        
-        # By query type
+        # One pass over the results fills the score arrays and the
+        # per-type running sums: [count, relevancy sum, precision sum]
+        num_results = len(successful_results)
+        relevancy_scores = np.empty(num_results)
+        precision_scores = np.empty(num_results)
+        times = np.empty(num_results)
+        recall_sum = 0.0
         by_type = {}
-        for result in successful_results:
-            qtype = result["query_type"]
-            if qtype not in by_type:
-                by_type[qtype] = {
-                    "count": 0,
-                    "answer_relevancy": [],
-                    "context_precision": []
-                }
-            by_type[qtype]["count"] += 1
-            by_type[qtype]["answer_relevancy"].append(result["answer_relevancy"]["total"])
-            by_type[qtype]["context_precision"].append(result["context_precision"]["precision"])
+        for i, result in enumerate(successful_results):
+            relevancy = result["answer_relevancy"]["total"]
+            context = result["context_precision"]
+            relevancy_scores[i] = relevancy
+            precision_scores[i] = context["precision"]
+            times[i] = result["processing_time"]
+            recall_sum += context["recall"]
+            
+            type_sums = by_type.setdefault(result["query_type"], [0, 0.0, 0.0])
+            type_sums[0] += 1
+            type_sums[1] += relevancy
+            type_sums[2] += context["precision"]
         
         # Calculate type averages
-        type_metrics = {}
-        for qtype, data in by_type.items():
-            type_metrics[qtype] = {
-                "count": data["count"],
-                "avg_answer_relevancy": sum(data["answer_relevancy"]) / len(data["answer_relevancy"]),
-                "avg_context_precision": sum(data["context_precision"]) / len(data["context_precision"])
+        type_metrics = {
+            qtype: {
+                "count": count,
+                "avg_answer_relevancy": relevancy_sum / count,
+                "avg_context_precision": precision_sum / count
             }
+            for qtype, (count, relevancy_sum, precision_sum) in by_type.items()
+        }
         
         return {
-            "answer_relevancy": {
-                "mean": sum(relevancy_scores) / len(relevancy_scores),
-                "median": sorted(relevancy_scores)[len(relevancy_scores)//2],
-                "min": min(relevancy_scores),
-                "max": max(relevancy_scores)
-            },
-            "context_precision": {
-                "mean": sum(precision_scores) / len(precision_scores),
-                "median": sorted(precision_scores)[len(precision_scores)//2],
-                "min": min(precision_scores),
-                "max": max(precision_scores)
-            },
+            "answer_relevancy": self._summary_stats(relevancy_scores),
+            "context_precision": self._summary_stats(precision_scores),
             "context_recall": {
-                "mean": sum(r["context_precision"]["recall"] for r in successful_results) / len(successful_results)
-            },
-            "processing_time": {
-                "mean": sum(times) / len(times),
-                "median": sorted(times)[len(times)//2],
-                "min": min(times),
-                "max": max(times)
+                "mean": recall_sum / num_results
             },
+            "processing_time": self._summary_stats(times),
             "by_query_type": type_metrics
         }
     
     def save_results(self, evaluation_results: Dict, filepath: str):
         """Save evaluation results to JSON file."""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(evaluation_results, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(
+                    evaluation_results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                ))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(evaluation_results, f, indent=2, ensure_ascii=False)
         
         print(f"\n✅ Results saved to {filepath}")
     
@@ -337,6 +708,24 @@ Be strict but fair. Consider:
                 print(f"      Context Precision: {data['avg_context_precision']:.3f}")
         
         print(f"\n{'='*60}\n")
+    
+    def close(self):
+        """Flush the judge cache and results log and release the client and event loop."""
+        if self._judge_cache is not None:
+            self._judge_cache.close()
+            self._judge_cache = None
+        if self._results_log is not None:
+            self._results_log.close()
+            self._results_log = None
+        if not self._loop.is_closed():
+            self._loop.run_until_complete(self.anthropic_client.close())
+            self._loop.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
 if __name__ == "__main__":
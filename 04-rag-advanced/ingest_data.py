@@ -126,8 +126,9 @@ class DataIngestion:
         for i in tqdm(range(0, len(texts), batch_size), desc="Generating embeddings"):
             batch = texts[i:i+batch_size]
             try:
-                # Use the shared embedding model
-                batch_embeddings = self.embedding_model.encode(batch)
+                # Use the shared embedding model; document chunks are embedded
+                # once, so they bypass the query embedding cache
+                batch_embeddings = self.embedding_model.encode(batch, use_cache=False)
                 
                 # batch_embeddings should already be a list of lists
                 # Just ensure it's the right format
@@ -6,8 +6,12 @@ Enhanced RAG Pipeline with multiple improvements:
 - Iteration 4: Context Compression
 """
 import anthropic
+import hashlib
+import sqlite3
+import threading
 import weaviate
 import weaviate.classes as wvc
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 import time
 import re
@@ -15,11 +19,59 @@ from collections import Counter
 from config import Config
 from embeddings import EmbeddingModel
 
+CROSS_ENCODER_MODEL = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+
+
+class ScorerCache:
+    """
+    Cross-encoder scores persisted in SQLite, keyed by (query hash, document key).
+    A single connection is shared between threads behind a lock.
+    """
+
+    def __init__(self, path: str, model_name: str = CROSS_ENCODER_MODEL):
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "query_hash TEXT, doc_key TEXT, score REAL, PRIMARY KEY (query_hash, doc_key))"
+        )
+        self._conn.commit()
+
+    def query_hash(self, query: str) -> str:
+        """Includes the model name so switching cross-encoders re-scores."""
+        text = f"{self.model_name}\x00{query}"
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def get_many(self, query_hash: str, doc_keys: List[str]) -> Dict[str, float]:
+        """Return the cached scores among doc_keys with one SELECT."""
+        if not doc_keys:
+            return {}
+        placeholders = ",".join("?" * len(doc_keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc_key, score FROM scores WHERE query_hash = ? AND doc_key IN ({placeholders})",
+                [query_hash, *doc_keys]
+            ).fetchall()
+        return dict(rows)
+
+    def set_many(self, query_hash: str, scores: Dict[str, float]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores (query_hash, doc_key, score) VALUES (?, ?, ?)",
+                [(query_hash, doc_key, score) for doc_key, score in scores.items()]
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
 
 class EnhancedRAGPipeline:
     """Enhanced Retrieval-Augmented Generation pipeline with advanced techniques."""
 
-    def __init__(self, iteration: int = 4):
+    def __init__(self, iteration: int = 4, scorer_cache_path: Optional[str] = Config.SCORER_CACHE_PATH):
         """
         Initialize enhanced RAG pipeline.
         
@@ -29,8 +81,9 @@ class EnhancedRAGPipeline:
                 2: + Cross-Encoder Re-ranking
                 3: + Query Decomposition
                 4: + Context Compression
+            scorer_cache_path: SQLite file for cached cross-encoder scores
+                (None or empty disables the cache)
         """
-        self.iteration = iteration
         self.config = Config()
         self.anthropic_client = anthropic.Anthropic(api_key=Config.ANTHROPIC_API_KEY)
         
@@ -38,19 +91,45 @@ class EnhancedRAGPipeline:
         self.embedding_model = EmbeddingModel()
         print("   ✅ Embedding model loaded")
         
+        self.cross_encoder = None
+        self._cross_encoder_loaded = False
+        self.scorer_cache_path = scorer_cache_path
+        self.scorer_cache = None
+        self.set_iteration(iteration)
+        
+        # BM25 legs of hybrid searches and the sub-queries of a decomposed
+        # query run on separate pools, so a sub-query task never waits on a
+        # pool that its own siblings have filled
+        self.search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-bm25")
+        self.subquery_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-subquery")
+        # Compression calls go out in parallel; the worker count caps the
+        # requests in flight per query to stay within Anthropic rate limits
+        self.compression_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rag-compress")
+        
+        self.weaviate_client = None
+        self.collection = None
+        self.connect()
+
+    def set_iteration(self, iteration: int):
+        """
+        Switch which enhancements are enabled without reconnecting or
+        reloading models. The cross-encoder is loaded the first time an
+        iteration that needs it (2+) is selected.
+        """
+        self.iteration = iteration
+        
         # Load cross-encoder for iteration 2+
-        if iteration >= 2:
+        if iteration >= 2 and not self._cross_encoder_loaded:
+            self._cross_encoder_loaded = True
             try:
                 from sentence_transformers import CrossEncoder
-                self.cross_encoder = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
+                self.cross_encoder = CrossEncoder(CROSS_ENCODER_MODEL)
                 print("   ✅ Cross-encoder loaded")
+                if self.scorer_cache_path:
+                    self.scorer_cache = ScorerCache(self.scorer_cache_path)
             except Exception as e:
                 print(f"   ⚠️  Cross-encoder failed to load: {e}")
                 self.cross_encoder = None
-        
-        self.weaviate_client = None
-        self.collection = None
-        self.connect()
 
     def connect(self):
         try:
@@ -286,6 +365,23 @@ class EnhancedRAGPipeline:
         
         return combined_filter
     
+    @staticmethod
+    def _doc_key(doc: Dict, with_content: bool = False) -> str:
+        """
+        Identify a report chunk by bank, quarter, year and report type, handling None values.
+        with_content appends a hash of the text the cross-encoder scores, so a
+        chunk re-ingested with different content gets a new key.
+        """
+        bank = doc.get('bank_name') or 'unknown'
+        quarter = doc.get('quarter') or 'unknown'
+        year = doc.get('year') or 0
+        report_type = doc.get('report_type') or 'unknown'
+        key = f"{bank}_{quarter}_{year}_{report_type}"
+        if with_content:
+            content = (doc.get('content') or '')[:512]
+            key += "_" + hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
+        return key
+    
     def hybrid_search(self, query: str, top_k: int = 10, metadata_filter: Dict = None, 
                      alpha: float = 0.5) -> List[Dict]:
         """
@@ -298,9 +394,11 @@ class EnhancedRAGPipeline:
             # Fall back to vector only
             return self.vector_search(query, top_k, metadata_filter)
         
-        # Get results from both methods
+        # Get results from both methods - the two Weaviate round-trips are
+        # independent, so BM25 runs on the pool while this thread does the vector search
+        bm25_future = self.search_executor.submit(self.bm25_search, query, top_k*2)
         vector_results = self.vector_search(query, top_k=top_k*2, metadata_filter=metadata_filter)
-        bm25_results = self.bm25_search(query, top_k=top_k*2)
+        bm25_results = bm25_future.result()
         
         # Handle empty results
         if not vector_results and not bm25_results:
@@ -328,22 +426,12 @@ class EnhancedRAGPipeline:
         # Merge results by content (deduplicate) - handle None values
         merged = {}
         for doc in vector_results:
-            # Create key, handling None values
-            bank = doc.get('bank_name') or 'unknown'
-            quarter = doc.get('quarter') or 'unknown'
-            year = doc.get('year') or 0
-            report_type = doc.get('report_type') or 'unknown'
-            key = f"{bank}_{quarter}_{year}_{report_type}"
+            key = self._doc_key(doc)
             doc['hybrid_score'] = alpha * doc.get('normalized_score', 0)
             merged[key] = doc
         
         for doc in bm25_results:
-            # Create key, handling None values
-            bank = doc.get('bank_name') or 'unknown'
-            quarter = doc.get('quarter') or 'unknown'
-            year = doc.get('year') or 0
-            report_type = doc.get('report_type') or 'unknown'
-            key = f"{bank}_{quarter}_{year}_{report_type}"
+            key = self._doc_key(doc)
             if key in merged:
                 merged[key]['hybrid_score'] += (1 - alpha) * doc.get('normalized_score', 0)
                 merged[key]['source'] = 'hybrid'
@@ -367,15 +455,31 @@ class EnhancedRAGPipeline:
             return documents[:top_k]
         
         try:
-            # Prepare query-document pairs
-            pairs = [[query, doc['content'][:512]] for doc in documents]  # Limit content length
+            doc_keys = [self._doc_key(doc, with_content=True) for doc in documents]
+            cached_scores = {}
+            if self.scorer_cache is not None:
+                query_hash = self.scorer_cache.query_hash(query)
+                cached_scores = self.scorer_cache.get_many(query_hash, doc_keys)
             
-            # Get cross-encoder scores
-            scores = self.cross_encoder.predict(pairs)
+            # Only documents without a cached score go through the cross-encoder
+            misses = [(doc, key) for doc, key in zip(documents, doc_keys) if key not in cached_scores]
+            if misses:
+                # Prepare query-document pairs
+                pairs = [[query, doc['content'][:512]] for doc, _ in misses]  # Limit content length
+                
+                # Get cross-encoder scores. query() reranks the deduplicated documents
+                # of all sub-queries at once, so this is one predict per query. The
+                # progress bar is off explicitly: CrossEncoder enables it whenever
+                # logging is at INFO, as it is during evaluation runs
+                scores = self.cross_encoder.predict(pairs, batch_size=32, show_progress_bar=False)
+                new_scores = {key: float(score) for (_, key), score in zip(misses, scores)}
+                if self.scorer_cache is not None:
+                    self.scorer_cache.set_many(query_hash, new_scores)
+                cached_scores.update(new_scores)
             
             # Add scores to documents
-            for doc, score in zip(documents, scores):
-                doc['rerank_score'] = float(score)
+            for doc, key in zip(documents, doc_keys):
+                doc['rerank_score'] = cached_scores[key]
             
             # Sort by rerank score
             reranked = sorted(documents, key=lambda x: x['rerank_score'], reverse=True)
@@ -393,16 +497,21 @@ class EnhancedRAGPipeline:
     def compress_context(self, query: str, documents: List[Dict]) -> List[Dict]:
         """
         Remove irrelevant parts from retrieved documents to improve precision.
-        Uses LLM to extract only relevant information.
+        Uses LLM to extract only relevant information. The per-document
+        calls are independent and run concurrently.
         """
         if self.iteration < 4 or not documents:
             return documents
         
-        compressed_docs = []
-        
-        for doc in documents:
-            try:
-                compression_prompt = f"""Extract only the information relevant to this query from the document below.
+        # map keeps the documents in rank order
+        return list(self.compression_executor.map(
+            lambda doc: self._compress_document(query, doc), documents
+        ))
+    
+    def _compress_document(self, query: str, doc: Dict) -> Dict:
+        """Compress one document, falling back to the original content."""
+        try:
+            compression_prompt = f"""Extract only the information relevant to this query from the document below.
 
 Query: {query}
 
@@ -418,32 +527,30 @@ Instructions:
 
 Relevant Information:"""
 
-                message = self.anthropic_client.messages.create(
-                    model=Config.CHAT_MODEL,
-                    max_tokens=400,
-                    temperature=0,
-                    messages=[{"role": "user", "content": compression_prompt}]
-                )
-                
-                compressed_content = message.content[0].text.strip()
-                
-                if compressed_content != "NO_RELEVANT_INFO" and len(compressed_content) > 20:
-                    doc_copy = doc.copy()
-                    doc_copy['original_content'] = doc['content']
-                    doc_copy['content'] = compressed_content
-                    doc_copy['compressed'] = True
-                    compressed_docs.append(doc_copy)
-                else:
-                    # Keep original if compression failed or found nothing relevant
-                    doc['compressed'] = False
-                    compressed_docs.append(doc)
+            message = self.anthropic_client.messages.create(
+                model=Config.CHAT_MODEL,
+                max_tokens=400,
+                temperature=0,
+                messages=[{"role": "user", "content": compression_prompt}]
+            )
             
-            except Exception as e:
-                print(f"⚠️  Compression failed for document: {e}")
-                doc['compressed'] = False
-                compressed_docs.append(doc)
+            compressed_content = message.content[0].text.strip()
+            
+            if compressed_content != "NO_RELEVANT_INFO" and len(compressed_content) > 20:
+                doc_copy = doc.copy()
+                doc_copy['original_content'] = doc['content']
+                doc_copy['content'] = compressed_content
+                doc_copy['compressed'] = True
+                return doc_copy
+            
+            # Keep original if compression failed or found nothing relevant
+            doc['compressed'] = False
+            return doc
         
-        return compressed_docs
+        except Exception as e:
+            print(f"⚠️  Compression failed for document: {e}")
+            doc['compressed'] = False
+            return doc
 
     # ============================================================
     # Query Expansion (from base pipeline)
@@ -555,23 +662,24 @@ Answer:"""
         sub_queries, metadata = self.decompose_query(search_query)
         
         # Step 3: Hybrid search (Iteration 1+) or vector search
+        search = self.hybrid_search if self.iteration >= 1 else self.vector_search
+        if len(sub_queries) > 1:
+            # Decomposed queries fan out; map keeps the sub-query order
+            results = self.subquery_executor.map(
+                lambda sub_query: search(sub_query, top_k=top_k*2, metadata_filter=metadata),
+                sub_queries
+            )
+        else:
+            results = [search(sub_queries[0], top_k=top_k*2, metadata_filter=metadata)]
         all_documents = []
-        for sub_query in sub_queries:
-            if self.iteration >= 1:
-                docs = self.hybrid_search(sub_query, top_k=top_k*2, metadata_filter=metadata)
-            else:
-                docs = self.vector_search(sub_query, top_k=top_k*2, metadata_filter=metadata)
+        for docs in results:
             all_documents.extend(docs)
         
-        # Deduplicate documents - handle None values
+        # Deduplicate documents
         seen = set()
         unique_docs = []
         for doc in all_documents:
-            bank = doc.get('bank_name') or 'unknown'
-            quarter = doc.get('quarter') or 'unknown'
-            year = doc.get('year') or 0
-            report_type = doc.get('report_type') or 'unknown'
-            key = f"{bank}_{quarter}_{year}_{report_type}"
+            key = self._doc_key(doc)
             if key not in seen:
                 seen.add(key)
                 unique_docs.append(doc)
@@ -605,6 +713,12 @@ Answer:"""
         return result
 
     def close(self):
+        self.search_executor.shutdown(wait=False, cancel_futures=True)
+        self.subquery_executor.shutdown(wait=False, cancel_futures=True)
+        self.compression_executor.shutdown(wait=False, cancel_futures=True)
+        if self.scorer_cache is not None:
+            self.scorer_cache.close()
+            self.scorer_cache = None
         if self.weaviate_client:
             self.weaviate_client.close()
 
@@ -624,12 +738,13 @@ if __name__ == "__main__":
         "How did Halyk Bank's total assets change throughout 2024?"
     ]
     
-    for iteration in [1, 2, 3, 4]:
-        print(f"\n{'='*70}")
-        print(f"ITERATION {iteration} TEST")
-        print(f"{'='*70}\n")
-        
-        with EnhancedRAGPipeline(iteration=iteration) as rag:
+    with EnhancedRAGPipeline(iteration=1) as rag:
+        for iteration in [1, 2, 3, 4]:
+            print(f"\n{'='*70}")
+            print(f"ITERATION {iteration} TEST")
+            print(f"{'='*70}\n")
+            
+            rag.set_iteration(iteration)
             query = test_queries[0]
             print(f"Query: {query}\n")
             
@@ -2,6 +2,7 @@
 Main evaluation script to measure baseline and enhanced RAG performance.
 Runs all iterations and generates comparative reports.
 """
+import logging
 import sys
 import time
 from test_dataset import TestDataset
@@ -9,8 +10,19 @@ from evaluation import RAGEvaluator
 from rag_pipeline import RAGPipeline
 from rag_pipeline_enhanced import EnhancedRAGPipeline
 
+try:
+    from rich.logging import RichHandler
+except ImportError:  # optional: plain stderr logging
+    RichHandler = None
 
-def run_baseline_evaluation(sample_size=15):
+
+def configure_logging():
+    """Send evaluation progress logs to the console at INFO level."""
+    handlers = [RichHandler(show_path=False)] if RichHandler is not None else None
+    logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=handlers)
+
+
+def run_baseline_evaluation(evaluator: RAGEvaluator, sample_size=15, use_batch=False):
     """Run evaluation on baseline RAG pipeline."""
     print("\n" + "="*70)
     print("📊 BASELINE EVALUATION - Naive RAG Pipeline")
@@ -22,7 +34,6 @@ def run_baseline_evaluation(sample_size=15):
     print("   - This represents un-optimized starting point\n")
     
     try:
-        evaluator = RAGEvaluator()
         rag_pipeline = RAGPipeline()
         
         # Override query method to use naive settings
@@ -31,7 +42,10 @@ def run_baseline_evaluation(sample_size=15):
             return original_query(user_query, expand_query=False, top_k=15)
         rag_pipeline.query = naive_query
         
-        results = evaluator.evaluate_pipeline(rag_pipeline, sample_size=sample_size)
+        if use_batch:
+            results = evaluator.evaluate_pipeline_batch(rag_pipeline, sample_size=sample_size)
+        else:
+            results = evaluator.evaluate_pipeline(rag_pipeline, sample_size=sample_size)
         
         evaluator.print_summary(results["metrics"])
         evaluator.save_results(results, "evaluation_baseline.json")
@@ -47,8 +61,12 @@ def run_baseline_evaluation(sample_size=15):
         return None
 
 
-def run_iteration_evaluation(iteration: int, sample_size=15):
-    """Run evaluation on enhanced RAG pipeline for specific iteration."""
+def run_iteration_evaluation(evaluator: RAGEvaluator, rag_pipeline, iteration: int,
+                             sample_size=15, use_batch=False):
+    """
+    Run evaluation on enhanced RAG pipeline for specific iteration.
+    The pipeline is shared across iterations and switched with set_iteration().
+    """
     print("\n" + "="*70)
     print(f"📊 ITERATION {iteration} EVALUATION - Enhanced RAG Pipeline")
     print("="*70)
@@ -63,16 +81,16 @@ def run_iteration_evaluation(iteration: int, sample_size=15):
     print(f"\nEnhancements: {iteration_names.get(iteration, 'Unknown')}\n")
     
     try:
-        evaluator = RAGEvaluator()
-        rag_pipeline = EnhancedRAGPipeline(iteration=iteration)
+        rag_pipeline.set_iteration(iteration)
         
-        results = evaluator.evaluate_pipeline(rag_pipeline, sample_size=sample_size)
+        if use_batch:
+            results = evaluator.evaluate_pipeline_batch(rag_pipeline, sample_size=sample_size)
+        else:
+            results = evaluator.evaluate_pipeline(rag_pipeline, sample_size=sample_size)
         
         evaluator.print_summary(results["metrics"])
         evaluator.save_results(results, f"evaluation_iteration{iteration}.json")
         
-        rag_pipeline.close()
-        
         return results
     
     except Exception as e:
@@ -146,6 +164,7 @@ def compare_results(baseline_results, iteration_results):
 
 def main():
     """Main evaluation workflow."""
+    configure_logging()
     print("""
 ╔══════════════════════════════════════════════════════════════════╗
 ║                                                                  ║
@@ -163,6 +182,8 @@ def main():
     # Configuration
     SAMPLE_SIZE = 15  # Test on subset to save API costs (15 queries ~$1-2)
     RUN_FULL_TEST = False  # Set to True for full 45 queries
+    USE_BATCH_API = False  # Judge via Message Batches (half price, slower to return)
+    USE_JUDGE_CACHE = True  # Reuse verdicts for answers judged in earlier runs
     
     if RUN_FULL_TEST:
         SAMPLE_SIZE = None
@@ -181,29 +202,50 @@ def main():
     print("="*70)
     TestDataset.save_to_file("test_dataset.json")
     
+    # One evaluator (and Anthropic client connection pool) for all runs
+    evaluator = RAGEvaluator(use_cache=USE_JUDGE_CACHE)
+    
     # Step 2: Baseline evaluation
-    baseline_results = run_baseline_evaluation(sample_size=SAMPLE_SIZE)
+    baseline_results = run_baseline_evaluation(
+        evaluator, sample_size=SAMPLE_SIZE, use_batch=USE_BATCH_API
+    )
     
     if not baseline_results:
         print("\n❌ Baseline evaluation failed. Cannot continue.")
+        evaluator.close()
         sys.exit(1)
     
     time.sleep(2)
     
-    # Step 3: Run all iterations
+    # Step 3: Run all iterations on one enhanced pipeline, so the Weaviate
+    # connection and the cross-encoder are set up once rather than per iteration
     all_iteration_results = {}
     
-    for iteration in [1, 2, 3, 4]:
-        print(f"\n⏳ Waiting 3 seconds before next iteration...")
-        time.sleep(3)
-        
-        iteration_results = run_iteration_evaluation(iteration, sample_size=SAMPLE_SIZE)
-        
-        if iteration_results:
-            all_iteration_results[iteration] = iteration_results
+    try:
+        enhanced_pipeline = EnhancedRAGPipeline(iteration=1)
+    except Exception as e:
+        print(f"❌ Enhanced pipeline failed to start: {e}")
+        enhanced_pipeline = None
+    
+    if enhanced_pipeline:
+        for iteration in [1, 2, 3, 4]:
+            print(f"\n⏳ Waiting 3 seconds before next iteration...")
+            time.sleep(3)
             
-            # Compare with baseline
-            compare_results(baseline_results, iteration_results)
+            iteration_results = run_iteration_evaluation(
+                evaluator, enhanced_pipeline, iteration,
+                sample_size=SAMPLE_SIZE, use_batch=USE_BATCH_API
+            )
+            
+            if iteration_results:
+                all_iteration_results[iteration] = iteration_results
+                
+                # Compare with baseline
+                compare_results(baseline_results, iteration_results)
+        
+        enhanced_pipeline.close()
+    
+    evaluator.close()
     
     # Step 4: Final summary
     print("\n" + "="*70)
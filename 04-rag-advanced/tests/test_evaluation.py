@@ -0,0 +1,93 @@
+# python
+import sys
+import os
+import pytest
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+pytest.importorskip("anthropic")
+pytest.importorskip("dotenv")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from evaluation import RAGEvaluator
+
+
+class StubPipeline:
+    def query(self, user_query, expand_query=True, top_k=5):
+        return {"answer": f"Answer to {user_query}", "sources": []}
+
+
+def make_evaluator(monkeypatch, max_concurrency=2):
+    evaluator = RAGEvaluator(max_concurrency=max_concurrency, use_cache=False, retrieval_concurrency=2)
+
+    async def fixed_verdict(query, answer, expected_answer):
+        return {"accuracy": 30, "completeness": 20, "relevance": 25, "total": 75, "reasoning": "stub"}
+
+    monkeypatch.setattr(evaluator, "evaluate_answer_relevancy", fixed_verdict)
+    return evaluator
+
+def test_judge_error_is_recorded_as_failed_judging(monkeypatch):
+    evaluator = make_evaluator(monkeypatch)
+    failing_id = evaluator.test_queries[1]["id"]
+    context_eval = evaluator._context_eval
+
+    def flaky_context_eval(test_query, result):
+        if test_query["id"] == failing_id:
+            raise KeyError("sources")
+        return context_eval(test_query, result)
+
+    monkeypatch.setattr(evaluator, "_context_eval", flaky_context_eval)
+    with evaluator:
+        summary = evaluator.evaluate_pipeline(StubPipeline(), sample_size=4)
+
+    assert summary["total_queries"] == 4
+    assert summary["failed_queries"] == 1
+    failed = [r for r in summary["results"] if not r["success"]]
+    assert failed[0]["query_id"] == failing_id
+    assert "sources" in failed[0]["error"]
+    # The RAG result survives a judging error
+    assert failed[0]["error_stage"] == "judge"
+    assert failed[0]["answer"].startswith("Answer to")
+    assert failed[0]["num_sources"] == 0
+
+def test_run_completes_when_every_judgement_fails(monkeypatch):
+    # One judge worker and more queries than the queue holds: a worker
+    # dying on the first error would leave retrieval blocked on put()
+    evaluator = make_evaluator(monkeypatch, max_concurrency=1)
+
+    async def broken_relevancy(query, answer, expected_answer):
+        raise RuntimeError("cache write failed")
+
+    monkeypatch.setattr(evaluator, "evaluate_answer_relevancy", broken_relevancy)
+    with evaluator:
+        summary = evaluator.evaluate_pipeline(StubPipeline(), sample_size=8)
+
+    assert summary["total_queries"] == 8
+    assert summary["successful_queries"] == 0
+    assert all(r["error"] == "cache write failed" for r in summary["results"])
+
+def test_evaluate_single_query_returns_a_result(monkeypatch):
+    evaluator = make_evaluator(monkeypatch)
+    with evaluator:
+        result = evaluator.evaluate_single_query(StubPipeline(), evaluator.test_queries[0])
+    assert result["success"]
+    assert result["answer_relevancy"]["total"] == 75
+
+def test_truncated_judge_reply_is_not_cached(monkeypatch, tmp_path):
+    evaluator = RAGEvaluator(use_cache=True, cache_path=str(tmp_path / "judge_cache"))
+
+    class Block:
+        type = "text"
+        text = '{"accuracy_score": 30, "completeness_score": 20, "relevance_score": 25, "total_score": 75, "reasoning": "cut of'
+
+    class Message:
+        content = [Block()]
+        stop_reason = "max_tokens"
+
+    async def create(**kwargs):
+        return Message()
+
+    monkeypatch.setattr(evaluator.anthropic_client.messages, "create", create)
+    with evaluator:
+        verdict = evaluator._loop.run_until_complete(
+            evaluator.evaluate_answer_relevancy("query", "answer", "expected")
+        )
+        assert verdict["total"] == 75
+        assert len(evaluator._judge_cache) == 0
@@ -8,10 +8,95 @@ from __future__ import annotations
 
 import os
 import re
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to requests' stdlib decoder
+    orjson = None
+
+
+def _build_session() -> requests.Session:
+    """Pooled session with a short retry on transient gateway errors."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=50,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _json_body(resp: requests.Response) -> Any:
+    """Decode a JSON response body, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+# Shared by every client that is not given its own session, so connections to
+# the weather and news hosts stay alive across orchestrators and Streamlit sessions.
+_SESSION = _build_session()
+
+
+class _TTLCache:
+    """Small thread-safe cache whose entries expire ``ttl`` seconds after being stored.
+
+    When full, the oldest entry is evicted to make room for a new one.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.maxsize:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+
+class _LocationCharTable(dict):
+    """``str.translate`` table that deletes everything except ASCII letters, whitespace and hyphens.
+
+    Entries are filled in on first lookup, so any code point can be translated.
+    """
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        ch = chr(codepoint)
+        keep = (ch.isascii() and ch.isalpha()) or ch == "-" or ch.isspace()
+        self[codepoint] = codepoint if keep else None
+        return self[codepoint]
+
+
+# City coordinates do not change, so resolved locations are kept for a day.
+_GEOCODE_CACHE = _TTLCache(maxsize=512, ttl=24 * 60 * 60)
+# Open-Meteo refreshes its models every few minutes; keep forecasts for five.
+_WEATHER_CACHE = _TTLCache(maxsize=256, ttl=5 * 60)
 
 
 class MCPOpenMeteoClient:
@@ -25,44 +110,60 @@ class MCPOpenMeteoClient:
     GEO_URL = "https://geocoding-api.open-meteo.com/v1/search"
     WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
 
+    # Location parsing patterns, compiled once for all queries.
+    _LOC_RE = re.compile(r"in\s+([A-Za-z\s\-]+)", re.IGNORECASE)
+    _STOP_RE = re.compile(r"\b(and|with|for|,|\.|\?)\b")
+    _CAPTOK_RE = re.compile(r"[A-Z][a-zA-Z\-]+")
+    _LOCATION_CHARS = _LocationCharTable()
+    _ALIASES = {
+        "nursultan": "Astana",
+        "nur sultan": "Astana",
+        "nur-sultan": "Astana",
+        "astana": "Astana",
+    }
+
     def __init__(self, session: Optional[requests.Session] = None) -> None:
-        self.session = session or requests.Session()
+        self.session = session or _SESSION
+        # Runs the fallback-city geocode alongside the primary one.
+        self._geocode_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="geocode")
+
+    def close(self) -> None:
+        """Release the thread used for speculative geocoding."""
+        self._geocode_pool.shutdown(wait=False, cancel_futures=True)
 
     def _extract_location_hint(self, query: str) -> str:
         """Return a best-effort location string for geocoding."""
-        match = re.search(r"in\s+([A-Za-z\s\-]+)", query, flags=re.IGNORECASE)
+        match = self._LOC_RE.search(query)
         if match:
             candidate = match.group(1)
             # Stop at common conjunctions or punctuation to avoid trailing words like "and headlines".
-            candidate = re.split(r"\b(and|with|for|,|\.|\?)\b", candidate, maxsplit=1)[0]
+            candidate = self._STOP_RE.split(candidate, maxsplit=1)[0]
         else:
             candidate = query
 
-        cleaned = re.sub(r"[^A-Za-z\s\-]", "", candidate)
-        cleaned = re.sub(r"\s+", " ", cleaned).strip()
+        cleaned = " ".join(candidate.translate(self._LOCATION_CHARS).split())
         return self._normalize_alias(cleaned) or "Almaty"
 
     def _normalize_alias(self, city: str) -> str:
         """Map common aliases to improve geocoding hits."""
-        aliases = {
-            "nursultan": "Astana",
-            "nur sultan": "Astana",
-            "nur-sultan": "Astana",
-            "astana": "Astana",
-        }
-        key = city.lower()
-        return aliases.get(key, city)
+        return self._ALIASES.get(city.lower(), city)
 
     def _fallback_city_from_query(self, query: str) -> Optional[str]:
         """Fallback city extraction: last capitalized token chunk."""
-        tokens = re.findall(r"[A-Z][a-zA-Z\-]+", query)
+        tokens = self._CAPTOK_RE.findall(query)
         if tokens:
             return tokens[-1]
         return None
 
     def geocode(self, query: str) -> Optional[Dict[str, Any]]:
+        name = self._extract_location_hint(query)
+        cache_key = name.lower()
+        cached = _GEOCODE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         payload = {
-            "name": self._extract_location_hint(query),
+            "name": name,
             "count": 1,
             "language": "en",
             "format": "json",
@@ -70,19 +171,31 @@ class MCPOpenMeteoClient:
         try:
             resp = self.session.get(self.GEO_URL, params=payload, timeout=10)
             resp.raise_for_status()
-            data = resp.json()
+            data = _json_body(resp)
         except Exception:
             return None
 
         results = data.get("results") or []
-        return results[0] if results else None
+        if not results:
+            return None
+        # Only hits are cached; a miss may be a transient error worth retrying.
+        _GEOCODE_CACHE.set(cache_key, results[0])
+        return results[0]
 
     def fetch_weather(self, query: str) -> Dict[str, Any]:
+        # Geocode the fallback city speculatively so a miss on the primary
+        # hint costs no extra round trip; the primary hit still wins.
+        fallback_city = self._fallback_city_from_query(query)
+        fallback_geo = None
+        if fallback_city and self._extract_location_hint(fallback_city) != self._extract_location_hint(query):
+            fallback_geo = self._geocode_pool.submit(self.geocode, fallback_city)
+
         geo = self.geocode(query)
-        if not geo:
-            fallback_city = self._fallback_city_from_query(query)
-            if fallback_city:
-                geo = self.geocode(fallback_city)
+        if geo:
+            if fallback_geo:
+                fallback_geo.cancel()
+        elif fallback_geo:
+            geo = fallback_geo.result()
         if not geo:
             return {
                 "error": "Could not resolve a location. Please provide a city or coordinates.",
@@ -102,9 +215,14 @@ class MCPOpenMeteoClient:
             params["daily"] = "precipitation_probability_max,temperature_2m_max,temperature_2m_min,snowfall_sum"
             params["forecast_days"] = 2
         try:
-            resp = self.session.get(self.WEATHER_URL, params=params, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
+            # The date is part of the key so "tomorrow" never comes from yesterday's forecast.
+            cache_key = (round(params["latitude"], 2), round(params["longitude"], 2), wants_future, date.today())
+            data = _WEATHER_CACHE.get(cache_key)
+            if data is None:
+                resp = self.session.get(self.WEATHER_URL, params=params, timeout=10)
+                resp.raise_for_status()
+                data = _json_body(resp)
+                _WEATHER_CACHE.set(cache_key, data)
             cw = data.get("current_weather", {})
             rain_chance = None
             snow_cm = None
@@ -158,8 +276,14 @@ class MCPNewsClient:
     FALLBACK_BASE = "https://hn.algolia.com/api/v1/search"
 
     def __init__(self, session: Optional[requests.Session] = None) -> None:
-        self.session = session or requests.Session()
+        self.session = session or _SESSION
         self.api_token = os.getenv("NEWS_API_TOKEN", "demo")
+        # Runs the fallback fetch alongside the primary one.
+        self._fallback_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="news-fallback")
+
+    def close(self) -> None:
+        """Release the threads used for speculative fallback fetches."""
+        self._fallback_pool.shutdown(wait=False, cancel_futures=True)
 
     def _shape_primary(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         shaped: List[Dict[str, Any]] = []
@@ -201,7 +325,7 @@ class MCPNewsClient:
         try:
             resp = self.session.get(endpoint, params=params, timeout=10)
             resp.raise_for_status()
-            data = resp.json()
+            data = _json_body(resp)
             articles = data.get("data") or []
             return self._shape_primary(articles)
         except Exception:
@@ -220,18 +344,22 @@ class MCPNewsClient:
         try:
             resp = self.session.get(self.FALLBACK_BASE, params=params, timeout=10)
             resp.raise_for_status()
-            data = resp.json()
+            data = _json_body(resp)
             hits = data.get("hits") or []
             return self._shape_fallback(hits)
         except Exception:
             return []
 
     def fetch_news(self, query: Optional[str], limit: int = 5) -> Dict[str, Any]:
+        # Start the fallback speculatively so an unavailable primary costs no
+        # extra round trip; a primary hit still wins.
+        fallback_future = self._fallback_pool.submit(self.fetch_fallback, query, limit)
         primary = self.fetch_primary(query, limit)
         if primary:
+            fallback_future.cancel()
             return {"provider": "thenewsapi", "articles": primary}
 
-        fallback = self.fetch_fallback(query, limit)
+        fallback = fallback_future.result()
         if not fallback and query:
             # Retry with a neutral query to ensure we return something fresh.
             fallback = self.fetch_fallback(None, limit)
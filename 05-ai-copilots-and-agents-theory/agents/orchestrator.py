@@ -2,8 +2,11 @@
 from __future__ import annotations
 
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
 
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import PromptTemplate
@@ -11,23 +14,36 @@ from langchain_core.runnables import RunnableSequence
 
 from .mcp_clients import MCPNewsClient, MCPOpenMeteoClient
 
+# Keys of a handle_query response, in the order they are returned.
+RESPONSE_PARTS = ("intents", "weather", "news", "message")
+
 
 @dataclass
 class OrchestratorConfig:
     model: str = os.getenv("CHAT_MODEL", "claude-3-5-sonnet-latest")
     temperature: float = 0.0
     news_limit: int = 5
+    # Queries shorter than this that match no keyword are answered as unknown
+    # without asking the LLM; 0 always asks.
+    min_words_for_llm: int = 0
 
 
 class AgentOrchestrator:
     """Routes user intents to MCP-backed tools and aggregates responses."""
 
+    INTENT_CACHE_SIZE = 1024
+
     def __init__(self, config: Optional[OrchestratorConfig] = None) -> None:
         self.config = config or OrchestratorConfig()
         self.weather_client = MCPOpenMeteoClient()
         self.news_client = MCPNewsClient()
+        # Weather and news lookups are independent HTTP chains, so they run side by side.
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mcp-tool")
         self.llm = ChatAnthropic(model=self.config.model, temperature=self.config.temperature)
         self.intent_chain = self._build_intent_chain()
+        # Per-instance so the cache goes away with the orchestrator.
+        self._intent_cache: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self._intent_lock = threading.Lock()
 
     def _build_intent_chain(self) -> RunnableSequence:
         prompt = PromptTemplate(
@@ -52,32 +68,76 @@ class AgentOrchestrator:
             intents.add("news")
         return intents
 
+    def _llm_intents(self, query: str) -> FrozenSet[str]:
+        """Ask the LLM for the intents; raises on failure so errors are not cached."""
+        llm_result = self.intent_chain.invoke({"query": query})
+        raw = llm_result.content.strip().lower()
+        return frozenset(intent for intent in ("weather", "news") if intent in raw)
+
+    def _cached_llm_intents(self, query: str) -> FrozenSet[str]:
+        """LRU over _llm_intents keyed by the lower-cased, whitespace-normalized query.
+
+        The LLM still sees the query as typed; only the cache key is normalized.
+        """
+        key = " ".join(query.lower().split())
+        with self._intent_lock:
+            intents = self._intent_cache.get(key)
+            if intents is not None:
+                self._intent_cache.move_to_end(key)
+                return intents
+
+        intents = self._llm_intents(query)
+        with self._intent_lock:
+            self._intent_cache[key] = intents
+            if len(self._intent_cache) > self.INTENT_CACHE_SIZE:
+                self._intent_cache.popitem(last=False)
+        return intents
+
     def classify_intent(self, query: str) -> Set[str]:
         heuristic = self._fallback_intents(query)
         if heuristic:
             return heuristic
 
+        words = query.lower().split()
+        if len(words) < self.config.min_words_for_llm:
+            return {"unknown"}
+
         try:
-            llm_result = self.intent_chain.invoke({"query": query})
-            raw = llm_result.content.strip().lower()
-            if "weather" in raw:
-                heuristic.add("weather")
-            if "news" in raw:
-                heuristic.add("news")
+            # Intents depend only on the query, so repeated phrasings skip the LLM call.
+            heuristic.update(self._cached_llm_intents(query))
         except Exception:
             pass
 
         return heuristic or {"unknown"}
 
-    def handle_query(self, query: str) -> Dict[str, any]:
+    def stream_query(self, query: str) -> Iterator[Tuple[str, Any]]:
+        """Yield ("intents", ...) first, then each tool result as soon as it is ready.
+
+        The pairs are the keys and values of the handle_query response.
+        """
         intents = self.classify_intent(query)
-        response: Dict[str, any] = {"intents": list(intents)}
+        yield "intents", list(intents)
 
+        futures = {}
         if "weather" in intents:
-            response["weather"] = self.weather_client.fetch_weather(query)
+            futures[self.executor.submit(self.weather_client.fetch_weather, query)] = "weather"
         if "news" in intents:
-            response["news"] = self.news_client.fetch_news(query, limit=self.config.news_limit)
+            futures[
+                self.executor.submit(self.news_client.fetch_news, query, limit=self.config.news_limit)
+            ] = "news"
+        for future in as_completed(futures):
+            yield futures[future], future.result()
 
         if intents == {"unknown"}:
-            response["message"] = "I could not determine if you want weather or news. Please ask about either."
-        return response
+            yield "message", "I could not determine if you want weather or news. Please ask about either."
+
+    def handle_query(self, query: str) -> Dict[str, any]:
+        # stream_query yields tools in completion order; the response keeps a fixed one.
+        parts = dict(self.stream_query(query))
+        return {key: parts[key] for key in RESPONSE_PARTS if key in parts}
+
+    def close(self) -> None:
+        """Release the worker threads used for tool calls and by the clients."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.weather_client.close()
+        self.news_client.close()